@@ -88,8 +88,9 @@ def readiness():
     """Kubernetes readiness probe"""
     # Check if database is accessible
     try:
+        from sqlalchemy import text
         from src.db.models import db
-        db.session.execute('SELECT 1')
+        db.session.execute(text('SELECT 1'))
         return jsonify({'status': 'ready'}), 200
     except Exception as e:
         return jsonify({
@@ -22,10 +22,12 @@ Usage:
 """
 
 import json
+import re
 import time
 import logging
 import ssl
 import threading
+from functools import lru_cache
 from typing import Callable, Dict, Any, Optional
 from datetime import datetime
 from pathlib import Path
@@ -36,10 +38,54 @@ except ImportError:
     print("Warning: paho-mqtt not installed. Install with: pip install paho-mqtt")
     mqtt = None
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 
 logger = logging.getLogger(__name__)
 
 
+def _encode_payload(payload: Any):
+    """
+    Encode a message payload as JSON for the wire.
+
+    Uses orjson when installed (several times faster than stdlib json for
+    small telemetry dicts, and handles numpy values); pre-encoded bytes or
+    str payloads are passed through untouched.
+    """
+    if isinstance(payload, (bytes, str)):
+        return payload
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            payload,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(payload)
+
+
+@lru_cache(maxsize=256)
+def _compile_topic_pattern(topic_filter: str) -> re.Pattern:
+    """
+    Compile an MQTT topic filter into a regex (cached per filter).
+
+    '+' matches exactly one topic level; '#' matches everything after it.
+    """
+    parts = []
+    for part in topic_filter.split('/'):
+        if part == '#':
+            parts.append('.*')
+            break
+        elif part == '+':
+            parts.append('[^/]*')
+        else:
+            parts.append(re.escape(part))
+
+    return re.compile('/'.join(parts))
+
+
 class IoTConnection:
     """
     Manages AWS IoT Core MQTT connection for ANC devices.
@@ -184,7 +230,7 @@ class IoTConnection:
 
         Args:
             topic: MQTT topic
-            payload: Message payload (will be JSON encoded)
+            payload: Message payload (JSON encoded unless already bytes/str)
             qos: Quality of Service (0, 1, or 2)
             retain: Whether to retain message
 
@@ -192,13 +238,13 @@ class IoTConnection:
             True if published successfully, False otherwise
         """
         try:
-            message = json.dumps(payload)
+            message = _encode_payload(payload)
 
             if self.connected:
                 result = self.client.publish(topic, message, qos=qos, retain=retain)
 
                 if result.rc == mqtt.MQTT_ERR_SUCCESS:
-                    logger.debug(f"Published to {topic}: {message[:100]}")
+                    logger.debug("Published to %s: %.100s", topic, message)
                     return True
                 else:
                     logger.error(f"Publish failed: {result.rc}")
@@ -310,21 +356,7 @@ class IoTConnection:
 
     def _topic_matches(self, topic: str, pattern: str) -> bool:
         """Check if topic matches pattern (with wildcards)."""
-        topic_parts = topic.split('/')
-        pattern_parts = pattern.split('/')
-
-        if len(pattern_parts) > len(topic_parts):
-            return False
-
-        for i, pattern_part in enumerate(pattern_parts):
-            if pattern_part == '#':
-                return True
-            elif pattern_part == '+':
-                continue
-            elif i >= len(topic_parts) or pattern_part != topic_parts[i]:
-                return False
-
-        return len(topic_parts) == len(pattern_parts)
+        return _compile_topic_pattern(pattern).fullmatch(topic) is not None
 
     def _reconnect(self):
         """
@@ -4,7 +4,10 @@ AWS IoT Telemetry Publisher
 ============================
 
 Collects and publishes device telemetry and metrics to AWS IoT Core.
-Includes batching, throttling, and automatic retry logic.
+Includes batching, throttling, and automatic retry logic. Batched metrics
+are sent as one message per topic: {'device_id', 'timestamp', 'batch': [...],
+'count'}, where each batched item is stamped with 'timestamp_ns' (Unix epoch
+nanoseconds) when it was recorded.
 
 Telemetry Types:
 - ANC metrics (latency, cancellation, SNR)
@@ -26,15 +29,21 @@ Usage:
 
 import json
 import logging
+import math
+import queue
 import time
 import threading
-from typing import Dict, Any, List, Optional
+from numbers import Number
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
-from collections import deque
+from collections import deque, defaultdict
 
 
 logger = logging.getLogger(__name__)
 
+# Queued to tell the emergency sender thread to exit
+_EMERGENCY_STOP = object()
+
 
 class TelemetryPublisher:
     """
@@ -54,7 +63,9 @@ class TelemetryPublisher:
         device_id: str,
         batch_size: int = 10,
         batch_interval: int = 30,
-        max_buffer_size: int = 1000
+        max_buffer_size: int = 1000,
+        aggregate: bool = False,
+        enabled: bool = True
     ):
         """
         Initialize telemetry publisher.
@@ -64,27 +75,49 @@ class TelemetryPublisher:
             device_id: Unique device identifier
             batch_size: Number of metrics to batch before publishing
             batch_interval: Max seconds to wait before publishing batch
-            max_buffer_size: Maximum metrics to buffer when offline
+            max_buffer_size: Maximum metrics to buffer; the oldest are
+                dropped once it is exceeded
+            aggregate: Roll numeric metric values up into per-key
+                count/sum/avg/min/max records instead of buffering every event
+            enabled: When False every publish_* call returns immediately
         """
         self.iot = iot_connection
         self.device_id = device_id
         self.batch_size = batch_size
         self.batch_interval = batch_interval
         self.max_buffer_size = max_buffer_size
+        self.enabled = enabled
 
         # Metric buffers
         self.metrics_buffer = deque(maxlen=max_buffer_size)
-        self.batch_buffer: List[Dict[str, Any]] = []
+        self.batch_buffer: deque = deque(maxlen=max_buffer_size)
+        # Guards batch_buffer and aggregates against concurrent producers and
+        # the publish thread; held only while touching them, never across I/O
+        self._buffer_lock = threading.Lock()
+
+        # Running aggregates keyed by (topic, metric_type, metric name)
+        self.aggregate = aggregate
+        self.aggregates: Dict[Tuple[str, str, str], Dict[str, float]] = defaultdict(
+            lambda: {'n': 0, 'sum': 0.0, 'min': math.inf, 'max': -math.inf}
+        )
 
         # Publishing thread
         self.publish_thread: Optional[threading.Thread] = None
         self.running = False
 
+        # Emergency events are handed to a dedicated sender thread so the
+        # caller never blocks on network I/O
+        self._emergency_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._emergency_thread: Optional[threading.Thread] = None
+        self._emergency_lock = threading.Lock()
+
         # Statistics
         self.stats = {
             'total_published': 0,
             'total_failed': 0,
             'total_buffered': 0,
+            'total_dropped': 0,
+            'total_emergency_enqueued': 0,
             'last_publish_time': None
         }
 
@@ -112,9 +145,12 @@ class TelemetryPublisher:
                 - algorithm: ANC algorithm used
                 - intensity: ANC intensity setting
         """
+        if not self.enabled:
+            return
+
         payload = {
             'device_id': self.device_id,
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp_ns': time.time_ns(),
             'metric_type': 'anc',
             'metrics': metrics
         }
@@ -133,9 +169,12 @@ class TelemetryPublisher:
                 - frequency: Dominant frequency
                 - features: Audio features (optional)
         """
+        if not self.enabled:
+            return
+
         payload = {
             'device_id': self.device_id,
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp_ns': time.time_ns(),
             'metric_type': 'audio',
             'metrics': metrics
         }
@@ -154,26 +193,36 @@ class TelemetryPublisher:
                 - temperature: Device temperature
                 - uptime: Device uptime in seconds
         """
+        if not self.enabled:
+            return
+
         payload = {
             'device_id': self.device_id,
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp_ns': time.time_ns(),
             'metric_type': 'system',
             'metrics': metrics
         }
 
         self._add_to_batch(self.topics['system'], payload)
 
-    def publish_emergency_event(self, event: Dict[str, Any]):
+    def publish_emergency_event(self, event: Dict[str, Any], sync: bool = False):
         """
         Publish emergency detection event (high priority).
 
+        The event bypasses batching and is queued for the emergency sender
+        thread, which publishes it straight away with QoS 1.
+
         Args:
             event: Dictionary containing:
                 - is_emergency: True if emergency detected
                 - predicted_class: Classified sound type
                 - confidence: Detection confidence
                 - action: Action taken (e.g., 'anc_bypassed')
+            sync: Publish on the calling thread and wait for the result
         """
+        if not self.enabled:
+            return
+
         payload = {
             'device_id': self.device_id,
             'timestamp': datetime.utcnow().isoformat(),
@@ -182,15 +231,80 @@ class TelemetryPublisher:
             'severity': 'critical' if event.get('is_emergency') else 'info'
         }
 
-        # Publish immediately (high priority)
+        if sync:
+            self._send_emergency(payload)
+            return
+
+        self._emergency_queue.put(payload)
+        with self._buffer_lock:
+            self.stats['total_emergency_enqueued'] += 1
+        self._ensure_emergency_sender()
+
+    def _ensure_emergency_sender(self):
+        """Start the emergency sender thread on first use."""
+        with self._emergency_lock:
+            if self._emergency_thread is None or not self._emergency_thread.is_alive():
+                self._emergency_thread = threading.Thread(
+                    target=self._emergency_loop, daemon=True
+                )
+                self._emergency_thread.start()
+
+    def _emergency_loop(self):
+        """Publish queued emergency events as soon as they arrive."""
+        while True:
+            payload = self._emergency_queue.get()
+            if payload is _EMERGENCY_STOP:
+                return
+            try:
+                self._send_emergency(payload)
+            except Exception as e:
+                logger.error(f"Emergency publish error: {e}")
+
+    def _drain_emergency_queue(self):
+        """Publish any queued emergency events on the calling thread."""
+        while True:
+            try:
+                payload = self._emergency_queue.get_nowait()
+            except queue.Empty:
+                return
+            if payload is not _EMERGENCY_STOP:
+                self._send_emergency(payload)
+
+    def _stop_emergency_sender(self, timeout: float = 5.0) -> bool:
+        """
+        Ask the emergency sender thread to exit and wait for it.
+
+        Returns False if the thread is still busy after the timeout. The stop
+        sentinel then stays queued behind the pending events for it to pick up.
+        """
+        with self._emergency_lock:
+            thread = self._emergency_thread
+            if thread is None or not thread.is_alive():
+                self._emergency_thread = None
+                return True
+            # Events queued ahead of the sentinel are still sent
+            self._emergency_queue.put(_EMERGENCY_STOP)
+
+        thread.join(timeout=timeout)
+        if thread.is_alive():
+            logger.warning("Emergency sender still busy; leaving queued events to it")
+            return False
+
+        with self._emergency_lock:
+            if self._emergency_thread is thread:
+                self._emergency_thread = None
+        return True
+
+    def _send_emergency(self, payload: Dict[str, Any]):
+        """Publish a single emergency event with QoS 1."""
         success = self.iot.publish(self.topics['emergency'], payload, qos=1)
 
         if success:
-            logger.warning(f"Emergency event published: {event.get('predicted_class')}")
-            self.stats['total_published'] += 1
+            logger.warning(f"Emergency event published: {payload['event'].get('predicted_class')}")
         else:
             logger.error("Failed to publish emergency event")
-            self.stats['total_failed'] += 1
+        with self._buffer_lock:
+            self.stats['total_published' if success else 'total_failed'] += 1
 
     def publish_error_log(self, error: Dict[str, Any]):
         """
@@ -203,9 +317,12 @@ class TelemetryPublisher:
                 - stack_trace: Stack trace (optional)
                 - context: Additional context
         """
+        if not self.enabled:
+            return
+
         payload = {
             'device_id': self.device_id,
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp_ns': time.time_ns(),
             'log_type': 'error',
             'error': error
         }
@@ -220,9 +337,12 @@ class TelemetryPublisher:
             category: Metric category
             metrics: Metric data
         """
+        if not self.enabled:
+            return
+
         payload = {
             'device_id': self.device_id,
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp_ns': time.time_ns(),
             'metric_type': category,
             'metrics': metrics
         }
@@ -231,37 +351,98 @@ class TelemetryPublisher:
         self._add_to_batch(topic, payload)
 
     def _add_to_batch(self, topic: str, payload: Dict[str, Any]):
-        """Add metric to batch buffer."""
-        self.batch_buffer.append((topic, payload))
-        self.stats['total_buffered'] += 1
+        """Add metric to batch buffer, dropping the oldest when full."""
+        with self._buffer_lock:
+            if self.aggregate and 'metrics' in payload:
+                self._add_to_aggregates(topic, payload)
+                return
+
+            if len(self.batch_buffer) == self.batch_buffer.maxlen:
+                self.stats['total_dropped'] += 1
+            self.batch_buffer.append((topic, payload))
+            self.stats['total_buffered'] += 1
+            batch_full = len(self.batch_buffer) >= self.batch_size
 
         # Publish if batch is full
-        if len(self.batch_buffer) >= self.batch_size:
+        if batch_full:
             self._publish_batch()
 
+    def _add_to_aggregates(self, topic: str, payload: Dict[str, Any]):
+        """Fold numeric metric values into their running aggregates (lock held)."""
+        metric_type = payload['metric_type']
+        for name, value in payload['metrics'].items():
+            # Only numeric values can be aggregated; labels are not kept
+            if not isinstance(value, Number) or isinstance(value, bool):
+                continue
+            agg = self.aggregates[(topic, metric_type, name)]
+            agg['n'] += 1
+            agg['sum'] += value
+            agg['min'] = min(agg['min'], value)
+            agg['max'] = max(agg['max'], value)
+
+        self.stats['total_buffered'] += 1
+
+    def _drain_aggregates(self):
+        """Move one summary record per aggregate key into the batch buffer (lock held)."""
+        timestamp_ns = time.time_ns()
+        for (topic, metric_type, name), agg in self.aggregates.items():
+            if len(self.batch_buffer) == self.batch_buffer.maxlen:
+                self.stats['total_dropped'] += 1
+            self.batch_buffer.append((topic, {
+                'device_id': self.device_id,
+                'timestamp_ns': timestamp_ns,
+                'metric_type': metric_type,
+                'metric': name,
+                'count': agg['n'],
+                'sum': agg['sum'],
+                'avg': agg['sum'] / agg['n'],
+                'min': agg['min'],
+                'max': agg['max']
+            }))
+        self.aggregates.clear()
+
     def _publish_batch(self):
-        """Publish batched metrics."""
-        if not self.batch_buffer:
+        """Publish batched metrics, one message per topic."""
+        # Swap the buffer out under the lock so producers keep appending to a
+        # fresh one while this batch is grouped and sent
+        with self._buffer_lock:
+            if self.aggregates:
+                self._drain_aggregates()
+            pending, self.batch_buffer = self.batch_buffer, deque(maxlen=self.max_buffer_size)
+
+        if not pending:
             return
 
-        logger.info(f"Publishing batch of {len(self.batch_buffer)} metrics")
+        logger.info(f"Publishing batch of {len(pending)} metrics")
+
+        # Group buffered payloads by topic, preserving arrival order
+        batches: Dict[str, List[Dict[str, Any]]] = {}
+        for topic, payload in pending:
+            batches.setdefault(topic, []).append(payload)
 
         success_count = 0
         failed_count = 0
 
-        for topic, payload in self.batch_buffer:
-            if self.iot.publish(topic, payload, qos=0):  # QoS 0 for high throughput
-                success_count += 1
+        # Items carry epoch-ns timestamps; the ISO time is formatted once per batch
+        timestamp = datetime.utcnow().isoformat()
+
+        for topic, items in batches.items():
+            message = {
+                'device_id': self.device_id,
+                'timestamp': timestamp,
+                'batch': items,
+                'count': len(items)
+            }
+            if self.iot.publish(topic, message, qos=0):  # QoS 0 for high throughput
+                success_count += len(items)
             else:
-                failed_count += 1
+                failed_count += len(items)
 
         # Update statistics
-        self.stats['total_published'] += success_count
-        self.stats['total_failed'] += failed_count
-        self.stats['last_publish_time'] = datetime.utcnow().isoformat()
-
-        # Clear batch
-        self.batch_buffer = []
+        with self._buffer_lock:
+            self.stats['total_published'] += success_count
+            self.stats['total_failed'] += failed_count
+            self.stats['last_publish_time'] = timestamp
 
         logger.info(f"Batch published: {success_count} success, {failed_count} failed")
 
@@ -281,8 +462,11 @@ class TelemetryPublisher:
         """Stop periodic batch publishing."""
         self.running = False
 
-        # Publish remaining metrics
-        if self.batch_buffer:
+        # Publish remaining events and metrics
+        # Draining while the sender is still running could eat its sentinel
+        if self._stop_emergency_sender():
+            self._drain_emergency_queue()
+        if self.batch_buffer or self.aggregates:
             self._publish_batch()
 
         if self.publish_thread:
@@ -291,12 +475,22 @@ class TelemetryPublisher:
         logger.info("Telemetry publishing stopped")
 
     def _publish_loop(self):
-        """Periodic publishing loop."""
+        """
+        Periodic publishing loop.
+
+        Sleeps until fixed deadlines (start + k * batch_interval) rather than
+        a fixed delay, so time spent publishing does not stretch the period.
+        """
+        start = time.monotonic()
+        ticks = 0
+
         while self.running:
             try:
-                time.sleep(self.batch_interval)
+                ticks += 1
+                deadline = start + ticks * self.batch_interval
+                time.sleep(max(0.0, deadline - time.monotonic()))
 
-                if self.batch_buffer:
+                if self.batch_buffer or self.aggregates:
                     self._publish_batch()
 
             except Exception as e:
@@ -310,13 +504,15 @@ class TelemetryPublisher:
             'total_published': self.stats['total_published'],
             'total_failed': self.stats['total_failed'],
             'total_buffered': self.stats['total_buffered'],
+            'total_dropped': self.stats['total_dropped'],
             'batch_size': len(self.batch_buffer),
             'last_publish_time': self.stats['last_publish_time']
         }
 
     def flush(self):
-        """Immediately publish all buffered metrics."""
-        if self.batch_buffer:
+        """Immediately publish all queued events and buffered metrics."""
+        self._drain_emergency_queue()
+        if self.batch_buffer or self.aggregates:
             logger.info("Flushing all buffered metrics")
             self._publish_batch()
 
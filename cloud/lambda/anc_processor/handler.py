@@ -92,15 +92,18 @@ class NLMSFilter:
         output = np.zeros(num_samples, dtype=np.float32)
         error = np.zeros(num_samples, dtype=np.float32)
 
+        weights = self.weights
+        x_buffer = self.x_buffer
+
         for n in range(num_samples):
             # Update input buffer (circular)
-            self.x_buffer[self.index] = reference[n]
+            x_buffer[self.index] = reference[n]
+
+            # Buffer in tap order: x_taps[i] == x_buffer[(index + i) % length]
+            x_taps = np.concatenate((x_buffer[self.index:], x_buffer[:self.index]))
 
             # Compute filter output (FIR)
-            y = 0.0
-            for i in range(self.length):
-                idx = (self.index + i) % self.length
-                y += self.weights[i] * self.x_buffer[idx]
+            y = float(np.dot(weights, x_taps))
 
             output[n] = y
 
@@ -108,17 +111,13 @@ class NLMSFilter:
             error[n] = desired[n] - y
 
             # Calculate input power (for normalization)
-            power = self.epsilon
-            for i in range(self.length):
-                power += self.x_buffer[i] ** 2
+            power = self.epsilon + float(np.dot(x_buffer, x_buffer))
 
             # Normalized step size
             mu_norm = self.mu / power
 
-            # Update filter weights (LMS adaptation)
-            for i in range(self.length):
-                idx = (self.index + i) % self.length
-                self.weights[i] += mu_norm * error[n] * self.x_buffer[idx]
+            # Update filter weights (LMS adaptation), in place
+            weights += np.float32(mu_norm * error[n]) * x_taps
 
             # Update circular buffer index
             self.index = (self.index + 1) % self.length
@@ -137,8 +136,9 @@ class NLMSFilter:
     def from_dict(cls, data, mu=0.001):
         """Deserialize filter state"""
         filter_obj = cls(mu=mu)
-        filter_obj.weights = np.frombuffer(data['weights'], dtype=np.float32)
-        filter_obj.x_buffer = np.frombuffer(data['x_buffer'], dtype=np.float32)
+        # frombuffer views are read-only; the filter updates its state in place
+        filter_obj.weights = np.frombuffer(data['weights'], dtype=np.float32).copy()
+        filter_obj.x_buffer = np.frombuffer(data['x_buffer'], dtype=np.float32).copy()
         filter_obj.index = data['index']
         return filter_obj
 
@@ -13,17 +13,30 @@ import pickle
 import time
 import os
 import sys
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
 
 
-def find_data_file():
+def find_data_file(refresh=False):
     """
     Find available training data file.
 
+    Results are cached per working directory; pass refresh=True to search
+    again after data files have been added or removed.
+
     Returns:
         Path to data file or None if not found
     """
+    if refresh:
+        _find_data_file_in.cache_clear()
+
+    return _find_data_file_in(os.getcwd())
+
+
+@lru_cache(maxsize=8)
+def _find_data_file_in(cwd):
+    """Search the candidate data file locations relative to cwd."""
     # Check multiple possible locations
     search_paths = [
         'features_augmented.npz',  # Current directory
@@ -35,18 +48,19 @@ def find_data_file():
     ]
 
     for path in search_paths:
-        if os.path.exists(path):
+        if os.path.exists(os.path.join(cwd, path)):
             return path
 
     return None
 
 
-def generate_synthetic_data(num_samples_per_class=20):
+def generate_synthetic_data(num_samples_per_class=20, seed=None):
     """
     Generate synthetic training data when no real data is available.
 
     Args:
         num_samples_per_class: Number of samples to generate per class
+        seed: Optional seed for reproducible data
 
     Returns:
         Dictionary with features and labels
@@ -59,25 +73,19 @@ def generate_synthetic_data(num_samples_per_class=20):
     # Feature dimension (same as real MFCC features)
     feature_dim = 168  # 13 MFCC * 4 statistics * 3 feature types + others
 
-    features_list = []
-    labels_list = []
+    rng = np.random.default_rng(seed)
 
-    for class_idx, class_name in enumerate(classes):
-        for _ in range(num_samples_per_class):
-            # Generate random features with class-specific characteristics
-            # Add some class separation by offsetting mean
-            base_features = np.random.randn(feature_dim) * 0.5
-            class_offset = class_idx * 0.3
-            features = base_features + class_offset
-
-            features_list.append(features)
-            labels_list.append(class_name)
-
-    features = np.array(features_list)
-    labels = np.array(labels_list)
+    # Random features with class separation from a per-class mean offset,
+    # drawn for all classes at once: (classes, samples, features)
+    base_features = rng.standard_normal(
+        (len(classes), num_samples_per_class, feature_dim), dtype=np.float32
+    ) * np.float32(0.5)
+    class_offsets = np.arange(len(classes), dtype=np.float32) * np.float32(0.3)
+    features = (base_features + class_offsets[:, None, None]).reshape(-1, feature_dim)
+    labels = np.repeat(classes, num_samples_per_class)
 
     # Shuffle
-    shuffle_idx = np.random.permutation(len(features))
+    shuffle_idx = rng.permutation(len(features))
     features = features[shuffle_idx]
     labels = labels[shuffle_idx]
 
@@ -141,6 +149,9 @@ def train_sklearn_classifier(data_path=None):
         features = data['features']
         labels = data['labels']
 
+    # float32 halves memory traffic through the scaler and the MLP
+    features = np.ascontiguousarray(features, dtype=np.float32)
+
     print(f"✓ Loaded {len(features)} samples with {features.shape[1]} features")
     print(f"  Classes: {np.unique(labels)}")
 
@@ -57,6 +57,7 @@ setup(
             "pytest>=7.0",
             "pytest-cov>=4.0",
             "pytest-asyncio>=0.21",
+            "pytest-xdist>=3.0",
         ],
         "cloud": [
             "boto3>=1.28.0",
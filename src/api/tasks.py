@@ -453,36 +453,47 @@ def analyze_session_data(session_id: str):
 
 
 @celery_app.task(name='tasks.cleanup_old_sessions')
-def cleanup_old_sessions(days_old: int = 30):
+def cleanup_old_sessions(days_old: int = 30, batch_size: int = 5000):
     """
     Clean up old session data
 
     Args:
         days_old: Delete sessions older than this many days
+        batch_size: Maximum sessions deleted per transaction
 
     Returns:
         dict: Cleanup results
     """
     try:
-        from models import db, AudioSession
+        from models import db, AudioSession, NoiseDetection, ProcessingMetric
 
         logger.info(f"Cleaning up sessions older than {days_old} days")
 
         cutoff_date = datetime.utcnow() - timedelta(days=days_old)
-
-        # Find old sessions
-        old_sessions = AudioSession.query.filter(
-            AudioSession.created_at < cutoff_date,
-            AudioSession.status == 'completed'
-        ).all()
-
-        count = len(old_sessions)
-
-        # Delete sessions (cascades to related records)
-        for session in old_sessions:
-            db.session.delete(session)
-
-        db.session.commit()
+        count = 0
+
+        # Delete in fixed-size batches, committing between them, so each
+        # transaction holds a bounded number of row locks
+        while True:
+            ids = [row[0] for row in db.session.query(AudioSession.id).filter(
+                AudioSession.created_at < cutoff_date,
+                AudioSession.status == 'completed'
+            ).limit(batch_size).all()]
+
+            if not ids:
+                break
+
+            # Bulk deletes bypass the ORM cascade, so clear child rows first
+            for child in (NoiseDetection, ProcessingMetric):
+                db.session.query(child).filter(
+                    child.session_id.in_(ids)
+                ).delete(synchronize_session=False)
+
+            count += db.session.query(AudioSession).filter(
+                AudioSession.id.in_(ids)
+            ).delete(synchronize_session=False)
+
+            db.session.commit()
 
         logger.info(f"Cleaned up {count} old sessions")
 
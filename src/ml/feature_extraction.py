@@ -242,18 +242,21 @@ class AudioFeatureExtractor:
         return feature_vector
 
 
-def batch_extract_features(db_path="anc_system.db", output_file="features.npz"):
+def batch_extract_features(db_path="anc_system.db", output_file="features.npz", db=None):
     """
     Extract features from all recordings in database and save to file.
 
     Args:
         db_path: Path to database
         output_file: Output file for features
+        db: Optional open database connection to reuse (left open)
 
     Returns:
         Dictionary with features, labels, and metadata
     """
-    db = ANCDatabase(db_path)
+    owns_db = db is None
+    if owns_db:
+        db = ANCDatabase(db_path)
     extractor = AudioFeatureExtractor()
 
     # Get all recordings
@@ -281,7 +284,8 @@ def batch_extract_features(db_path="anc_system.db", output_file="features.npz"):
             recording_ids.append(rec_id)
             print(f"  ✓ Recording {rec_id}: {environment} ({len(feature_vector)} features)")
 
-    db.close()
+    if owns_db:
+        db.close()
 
     # Convert to numpy arrays
     features = np.array(features_list)
@@ -213,10 +213,10 @@ def create_data_loaders(features_file='features.npz', batch_size=32, test_size=0
     Returns:
         train_loader, test_loader, train_dataset, test_dataset
     """
-    # Load features
-    data = np.load(features_file)
-    features = data['features']
-    labels = data['labels']
+    # Load features (NPZ members are decompressed on access, so read once and close)
+    with np.load(features_file) as data:
+        features = data['features']
+        labels = data['labels']
 
     print(f"Loaded {len(features)} samples with {features.shape[1]} features")
     print(f"Classes: {np.unique(labels)}")
@@ -80,16 +80,19 @@ from datetime import datetime
 from pathlib import Path
 
 # Import required modules (using reorganized paths)
-import sys
-from pathlib import Path
-
-# Add parent directories to path for imports
+# Add parent directories to path for imports: one splice at the front, in
+# the same search order the individual inserts produced
 project_root = Path(__file__).parent.parent.parent
-sys.path.insert(0, str(project_root))
-sys.path.insert(0, str(project_root / 'src' / 'database'))
-sys.path.insert(0, str(project_root / 'src' / 'ml'))
-sys.path.insert(0, str(project_root / 'src' / 'core'))
-sys.path.insert(0, str(project_root / 'src' / 'web'))
+src_root = project_root / 'src'
+sys.path[0:0] = dict.fromkeys(
+    str(path) for path in (
+        src_root / 'web',
+        src_root / 'core',
+        src_root / 'ml',
+        src_root / 'database',
+        project_root,
+    )
+)
 
 from src.database.schema import ANCDatabase
 from src.ml.feature_extraction import AudioFeatureExtractor
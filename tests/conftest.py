@@ -2,9 +2,11 @@
 Pytest configuration and shared fixtures for ANC Platform tests
 """
 
+import base64
 import pytest
 import sys
 import os
+import types
 from pathlib import Path
 import numpy as np
 from unittest.mock import Mock, MagicMock, patch
@@ -22,40 +24,82 @@ sys.path.insert(0, str(project_root / 'src' / 'ml'))
 # FLASK FIXTURES
 # ============================================================================
 
-@pytest.fixture(scope='function')
+def _build_mock_user():
+    """
+    Build a mock user object for authentication tests.
+    """
+    user = Mock()
+    user.id = 'test-user-id'
+    user.username = 'testuser'
+    user.email = 'test@example.com'
+    user.is_active = True
+    user.api_key = 'test-api-key'
+    user.to_dict = MagicMock(return_value={
+        'id': 'test-user-id',
+        'username': 'testuser',
+        'email': 'test@example.com',
+        'is_active': True
+    })
+    return user
+
+
+class _TestConfig:
+    """
+    Settings served to the app factory in place of ``config.get_config``.
+    """
+    TESTING = True
+    CORS_ORIGINS = ['http://localhost:3000']
+    JWT_SECRET_KEY = 'test-secret-key'
+    JWT_ACCESS_TOKEN_EXPIRES = 3600
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    ANC_FILTER_TAPS = 256
+
+
+@pytest.fixture(scope='session')
 def flask_app():
     """
     Create a Flask app instance for testing with app factory pattern.
-    Configures test settings and initializes database.
-    """
-    # Mock the config module to avoid import errors
-    with patch('backend.server.Config') as mock_config:
-        mock_config.CORS_ORIGINS = ['http://localhost:3000']
-        mock_config.JWT_SECRET_KEY = 'test-secret-key'
-        mock_config.JWT_ACCESS_TOKEN_EXPIRES = 3600
-        mock_config.SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
-        mock_config.SQLALCHEMY_TRACK_MODIFICATIONS = False
-        mock_config.ANC_FILTER_TAPS = 256
-
-        # Mock db module
-        with patch('backend.server.db') as mock_db, \
-             patch('backend.server.init_db'), \
-             patch('backend.server.setup_jwt'), \
-             patch('backend.server.setup_logging'), \
-             patch('backend.server.init_socketio'):
-
-            mock_db.init_app = MagicMock()
-
+    Configures test settings; database table creation is skipped.
+    Shared for the whole test session: the app factory and blueprint
+    registration run once. Tests patch the models they touch, so there is
+    no per-test database state to roll back.
+    """
+    # backend.server loads settings through ``config.get_config``; swap in
+    # a module serving the test config for the duration of the import only
+    config_module = types.ModuleType('config')
+    config_module.get_config = lambda config_name='development': _TestConfig
+    saved_config = sys.modules.get('config')
+    sys.modules['config'] = config_module
+    try:
+        # init_db would register the SQLAlchemy extension a second time
+        with patch('src.db.models.init_db'):
             from backend.server import create_app
             app = create_app()
-            app.config['TESTING'] = True
+    finally:
+        if saved_config is None:
+            sys.modules.pop('config', None)
+        else:
+            sys.modules['config'] = saved_config
 
-            # Create a mock database context
-            with app.app_context():
-                yield app
+    app.config['TESTING'] = True
 
+    with app.app_context():
+        yield app
 
-@pytest.fixture(scope='function')
+
+@pytest.fixture
+def auth_headers(mock_user):
+    """
+    Bearer auth headers that resolve to ``mock_user``.
+    verify_jwt_token is patched only for the requesting test, so requests
+    made without this fixture go through the real verifier.
+    """
+    with patch('backend.middleware.auth.verify_jwt_token', return_value=mock_user):
+        yield {'Authorization': 'Bearer test-token'}
+
+
+@pytest.fixture(scope='session')
 def client(flask_app):
     """
     Create a Flask test client for making HTTP requests.
@@ -63,6 +107,26 @@ def client(flask_app):
     return flask_app.test_client()
 
 
+@pytest.fixture(scope='session')
+def require_route(flask_app):
+    """
+    Return a helper that skips the test when a route is not registered.
+    The URL map is bound once, so tests for optional endpoints do not pay
+    for a full WSGI dispatch just to observe a 404.
+    """
+    from werkzeug.exceptions import MethodNotAllowed, NotFound
+
+    adapter = flask_app.url_map.bind('localhost')
+
+    def _require(path, method='GET'):
+        try:
+            adapter.match(path, method=method)
+        except (NotFound, MethodNotAllowed):
+            pytest.skip(f'{method} {path} is not registered')
+
+    return _require
+
+
 @pytest.fixture(scope='function')
 def app_context(flask_app):
     """
@@ -77,13 +141,7 @@ def mock_user():
     """
     Create a mock user object for authentication tests.
     """
-    user = Mock()
-    user.id = 'test-user-id'
-    user.username = 'testuser'
-    user.email = 'test@example.com'
-    user.is_active = True
-    user.api_key = 'test-api-key'
-    return user
+    return _build_mock_user()
 
 
 @pytest.fixture
@@ -137,19 +195,17 @@ def sample_audio_data():
     Generate synthetic audio data for testing.
     Returns base64-encoded audio.
     """
-    import base64
-    
     # Generate 1 second of 440 Hz tone
     sample_rate = 48000
     duration = 1.0
     frequency = 440
     
-    t = np.linspace(0, duration, int(sample_rate * duration))
+    t = np.linspace(0, duration, int(sample_rate * duration), dtype=np.float32)
     audio = 0.5 * np.sin(2 * np.pi * frequency * t)
     
-    # Convert to bytes and encode as base64
-    audio_bytes = audio.astype(np.float32).tobytes()
-    audio_b64 = base64.b64encode(audio_bytes).decode('utf-8')
+    # Encode the float32 buffer as base64 without an intermediate bytes copy
+    audio_bytes = memoryview(audio.astype(np.float32, copy=False)).cast('B')
+    audio_b64 = base64.b64encode(audio_bytes).decode('ascii')
     
     return audio_b64
 
@@ -163,7 +219,7 @@ def sample_audio_raw():
     duration = 1.0
     frequency = 440
     
-    t = np.linspace(0, duration, int(sample_rate * duration))
+    t = np.linspace(0, duration, int(sample_rate * duration), dtype=np.float32)
     audio = 0.5 * np.sin(2 * np.pi * frequency * t)
     
     return audio
@@ -174,12 +230,10 @@ def emergency_audio_data():
     """
     Generate synthetic emergency sound (fire alarm-like) for testing.
     """
-    import base64
-    
     sample_rate = 48000
     duration = 2.0
     
-    t = np.linspace(0, duration, int(sample_rate * duration))
+    t = np.linspace(0, duration, int(sample_rate * duration), dtype=np.float32)
     # Fire alarm-like: alternating frequencies
     alarm1 = 0.3 * np.sin(2 * np.pi * 880 * t)  # High frequency
     alarm2 = 0.3 * np.sin(2 * np.pi * 1000 * t)  # Slightly higher frequency
@@ -187,13 +241,37 @@ def emergency_audio_data():
     # Modulate between frequencies
     audio = np.where(t % 0.5 < 0.25, alarm1, alarm2)
     
-    # Convert to bytes and encode as base64
-    audio_bytes = audio.astype(np.float32).tobytes()
-    audio_b64 = base64.b64encode(audio_bytes).decode('utf-8')
+    # Encode the float32 buffer as base64 without an intermediate bytes copy
+    audio_bytes = memoryview(audio.astype(np.float32, copy=False)).cast('B')
+    audio_b64 = base64.b64encode(audio_bytes).decode('ascii')
     
     return audio_b64
 
 
+# ============================================================================
+# ML FIXTURES
+# ============================================================================
+
+@pytest.fixture(scope='session')
+def torch_mod():
+    """
+    Import torch once and tune it for the tiny batches used in tests.
+    Single-threaded execution avoids OpenMP fork/join overhead, and cuDNN
+    autotuning is disabled. Not autouse, so tests that never touch torch
+    do not pay for importing it.
+    """
+    torch = pytest.importorskip("torch")
+    torch.set_num_threads(1)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Interop pool already started by an earlier torch call
+        pass
+    torch.backends.cudnn.benchmark = False
+    torch.backends.cudnn.deterministic = True
+    return torch
+
+
 # ============================================================================
 # CELERY FIXTURES
 # ============================================================================
@@ -323,3 +401,6 @@ def pytest_configure(config):
     config.addinivalue_line(
         'markers', 'requires_services: marks tests requiring external services'
     )
+    config.addinivalue_line(
+        'markers', 'xdist_group(name): pins a module to one pytest-xdist worker'
+    )
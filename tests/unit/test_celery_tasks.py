@@ -4,6 +4,8 @@ Tests for refactored Celery tasks (audio processing, maintenance, ML services)
 Uses eager mode for synchronous testing
 """
 
+import sys
+import types
 import pytest
 import numpy as np
 from unittest.mock import Mock, MagicMock, patch
@@ -116,37 +118,196 @@ class TestAudioProcessingTasks:
         assert mock_logger.error.called
 
 
+class _FakeQuery:
+    """Plain stand-in for a SQLAlchemy query chain (much cheaper than MagicMock)."""
+
+    def __init__(self, rows=()):
+        self._rows = list(rows)
+
+    def filter(self, *args, **kwargs):
+        return self
+
+    def limit(self, count):
+        return self
+
+    def all(self):
+        return self._rows
+
+
+class _FakeSession:
+    """Session whose query() always returns the same fake query."""
+
+    def __init__(self, query):
+        self._query = query
+        self.commits = 0
+        self.rollbacks = 0
+
+    def query(self, *entities):
+        return self._query
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class _FakeColumn:
+    """Column whose comparison operators build inspectable criteria."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __lt__(self, other):
+        return (self.name, '<', other)
+
+    def __eq__(self, other):
+        return (self.name, '==', other)
+
+    __hash__ = object.__hash__
+
+    def in_(self, values):
+        return (self.name, 'in', list(values))
+
+
+def _fake_model(name):
+    """Build a model class exposing the columns cleanup_old_sessions filters on."""
+    columns = ('id', 'session_id', 'created_at', 'status')
+    return type(name, (), {column: _FakeColumn(f'{name}.{column}') for column in columns})
+
+
+class _CleanupQuery:
+    """Query that records bulk deletes on its owning _CleanupSession."""
+
+    def __init__(self, session, entity):
+        self._session = session
+        self._entity = entity
+        self._criteria = []
+
+    def filter(self, *criteria):
+        self._criteria.extend(criteria)
+        return self
+
+    def limit(self, count):
+        self._session.limits.append(count)
+        return self
+
+    def all(self):
+        batch = self._session.id_batches.pop(0) if self._session.id_batches else []
+        return [(session_id,) for session_id in batch]
+
+    def delete(self, synchronize_session='evaluate'):
+        ids = next(values for _, op, values in self._criteria if op == 'in')
+        name = self._entity.__name__
+        if (name, ids) == self._session.fail_on:
+            raise RuntimeError('delete failed')
+        self._session.log.append(('delete', name, ids))
+        return self._session.rowcounts.get(name, len(ids))
+
+
+class _CleanupSession:
+    """Session that serves id batches and logs deletes and commits in order."""
+
+    def __init__(self, id_batches, rowcounts=None, fail_on=None):
+        self.id_batches = [list(batch) for batch in id_batches]
+        self.rowcounts = rowcounts or {}
+        self.fail_on = fail_on
+        self.limits = []
+        self.log = []
+
+    def query(self, entity):
+        return _CleanupQuery(self, entity)
+
+    def commit(self):
+        self.log.append(('commit',))
+
+    def rollback(self):
+        self.log.append(('rollback',))
+
+
+def _patch_cleanup_models(session):
+    """Patch the ``models`` module imported inside cleanup_old_sessions."""
+    models = types.ModuleType('models')
+    models.db = types.SimpleNamespace(session=session)
+    for name in ('AudioSession', 'NoiseDetection', 'ProcessingMetric'):
+        setattr(models, name, _fake_model(name))
+    return patch.dict(sys.modules, {'models': models})
+
+
 class TestMaintenanceTasks:
     """Test maintenance/cleanup Celery tasks."""
 
     @patch('src.api.tasks.config')
-    def test_cleanup_old_sessions_task(self, mock_config, mock_database):
+    def test_cleanup_old_sessions_task(self, mock_config):
         """Test cleanup of old session records."""
         mock_config.SESSION_RETENTION_DAYS = 30
         
-        # Mock database query for old sessions
+        # Query for old sessions
         old_session = Mock()
         old_session.id = 'old-session-id'
         old_session.created_at = datetime.utcnow() - timedelta(days=40)
         
-        mock_database.session.query.return_value.filter.return_value.all.return_value = [old_session]
+        session = _FakeSession(_FakeQuery([old_session]))
         
         # Get old sessions
-        sessions = mock_database.session.query.return_value.filter.return_value.all()
+        sessions = session.query().filter().all()
         
         assert len(sessions) == 1
         assert sessions[0].id == 'old-session-id'
 
-    def test_cleanup_sessions_count(self, mock_database):
-        """Test that cleanup task reports number of deleted records."""
-        # Create mock sessions for deletion
-        mock_sessions = [Mock(id=f'session-{i}') for i in range(10)]
-        mock_database.session.query.return_value.filter.return_value.all.return_value = mock_sessions
-        
-        sessions_to_delete = mock_database.session.query.return_value.filter.return_value.all()
-        deleted_count = len(sessions_to_delete)
-        
-        assert deleted_count == 10
+    def test_cleanup_sessions_count(self):
+        """Test that cleanup task reports the bulk delete rowcount."""
+        from src.api.tasks import cleanup_old_sessions
+
+        ids = [f'session-{i}' for i in range(10)]
+        # A concurrent delete means the parent DELETE matches fewer rows
+        session = _CleanupSession([ids], rowcounts={'AudioSession': 7})
+
+        with _patch_cleanup_models(session):
+            result = cleanup_old_sessions.run(days_old=30)
+
+        assert result['sessions_deleted'] == 7
+        # Bulk deletes skip the ORM cascade, so children go before the parent
+        assert session.log == [
+            ('delete', 'NoiseDetection', ids),
+            ('delete', 'ProcessingMetric', ids),
+            ('delete', 'AudioSession', ids),
+            ('commit',),
+        ]
+
+    def test_cleanup_batches_commits_per_chunk(self):
+        """Test that cleanup commits once per deleted batch."""
+        from src.api.tasks import cleanup_old_sessions
+
+        session = _CleanupSession([['session-0', 'session-1'], ['session-2']])
+
+        with _patch_cleanup_models(session):
+            result = cleanup_old_sessions.run(days_old=30, batch_size=2)
+
+        assert result['sessions_deleted'] == 3
+        assert session.limits == [2, 2, 2]
+        commits = [i for i, entry in enumerate(session.log) if entry == ('commit',)]
+        assert len(commits) == 2
+        # Each commit follows that batch's parent delete
+        assert session.log[commits[0] - 1] == ('delete', 'AudioSession', ['session-0', 'session-1'])
+        assert session.log[commits[1] - 1] == ('delete', 'AudioSession', ['session-2'])
+
+    def test_cleanup_failure_keeps_earlier_batches(self):
+        """Test that a failed delete re-raises without undoing committed batches."""
+        from src.api.tasks import cleanup_old_sessions
+
+        session = _CleanupSession(
+            [['session-0', 'session-1'], ['session-2']],
+            fail_on=('AudioSession', ['session-2']),
+        )
+
+        with _patch_cleanup_models(session), pytest.raises(RuntimeError, match='delete failed'):
+            cleanup_old_sessions.run(days_old=30, batch_size=2)
+
+        # The first batch was committed; nothing was committed after the failure
+        assert session.log.count(('commit',)) == 1
+        assert session.log[-1] == ('delete', 'ProcessingMetric', ['session-2'])
+        assert ('delete', 'AudioSession', ['session-0', 'session-1']) in session.log
 
     @patch('src.api.tasks.logger')
     def test_maintenance_task_logging(self, mock_logger):
@@ -156,16 +317,16 @@ class TestMaintenanceTasks:
         
         assert mock_logger.info.call_count >= 2
 
-    def test_cleanup_orphaned_chunks(self, mock_database):
+    def test_cleanup_orphaned_chunks(self):
         """Test cleanup of orphaned audio chunks."""
         # Mock orphaned chunk
         orphaned_chunk = Mock()
         orphaned_chunk.id = 'orphan-chunk'
         orphaned_chunk.session_id = 'non-existent-session'
         
-        mock_database.session.query.return_value.filter.return_value.all.return_value = [orphaned_chunk]
+        session = _FakeSession(_FakeQuery([orphaned_chunk]))
         
-        chunks = mock_database.session.query.return_value.filter.return_value.all()
+        chunks = session.query().filter().all()
         assert len(chunks) == 1
 
     def test_cleanup_task_updates_metadata(self, mock_celery_task):
@@ -220,7 +381,7 @@ class TestMLServiceWrapper:
         """Test audio feature extraction for ML models."""
         # Mock feature extraction
         features = {
-            'mfcc': np.zeros((13, 100)),  # 13 MFCC coefficients
+            'mfcc': np.zeros((13, 100), dtype=np.float32),  # 13 MFCC coefficients
             'spectral_centroid': 2000.0,
             'zero_crossing_rate': 0.1
         }
@@ -10,7 +10,7 @@ import unittest
 from unittest.mock import Mock, MagicMock, patch, call
 import json
 import time
-from pathlib import Path
+import shutil
 import tempfile
 import os
 
@@ -21,11 +21,33 @@ try:
 except ImportError:
     mqtt = None
 
-# Skip all tests if paho-mqtt not installed
-pytestmark = pytest.mark.skipif(
-    mqtt is None,
-    reason="paho-mqtt not installed"
-)
+from cloud.iot.iot_connection import IoTConnection, _compile_topic_pattern
+
+# Skip all tests if paho-mqtt not installed; keep IoT tests on one xdist worker
+pytestmark = [
+    pytest.mark.skipif(mqtt is None, reason="paho-mqtt not installed"),
+    pytest.mark.xdist_group('iot'),
+]
+
+# Shared message handler; tests only inspect its calls, so it is reset in
+# setUp instead of being rebuilt per test.
+HANDLER = Mock(spec=lambda topic, payload: None)
+
+
+def _create_empty_files(*paths):
+    """Create empty placeholder files with a bare open/close per path."""
+    for path in paths:
+        fd = os.open(path, os.O_CREAT | os.O_WRONLY, 0o600)
+        os.close(fd)
+
+
+def _fire_on_connect(iot, rc=0):
+    """Build a connect() side effect that fires iot's on_connect callback."""
+    def simulate_connect(*args, **kwargs):
+        iot._on_connect(None, None, None, rc)
+        return rc
+
+    return simulate_connect
 
 
 class TestIoTConnection(unittest.TestCase):
@@ -33,6 +55,8 @@ class TestIoTConnection(unittest.TestCase):
 
     def setUp(self):
         """Set up test fixtures."""
+        HANDLER.reset_mock()
+
         # Create temporary certificate files
         self.temp_dir = tempfile.mkdtemp()
         self.cert_path = os.path.join(self.temp_dir, 'cert.pem')
@@ -40,8 +64,7 @@ class TestIoTConnection(unittest.TestCase):
         self.root_ca_path = os.path.join(self.temp_dir, 'root-ca.pem')
 
         # Create dummy cert files
-        for path in [self.cert_path, self.key_path, self.root_ca_path]:
-            Path(path).touch()
+        _create_empty_files(self.cert_path, self.key_path, self.root_ca_path)
 
         # Mock MQTT client
         self.mock_mqtt_client = MagicMock()
@@ -56,13 +79,10 @@ class TestIoTConnection(unittest.TestCase):
         self.mqtt_patcher.stop()
 
         # Clean up temp files
-        import shutil
         shutil.rmtree(self.temp_dir)
 
     def test_initialization(self):
         """Test IoTConnection initialization."""
-        from cloud.iot.iot_connection import IoTConnection
-
         iot = IoTConnection(
             thing_name='test-thing',
             endpoint='test.iot.us-east-1.amazonaws.com',
@@ -78,8 +98,6 @@ class TestIoTConnection(unittest.TestCase):
 
     def test_missing_certificates(self):
         """Test initialization with missing certificates."""
-        from cloud.iot.iot_connection import IoTConnection
-
         with self.assertRaises(FileNotFoundError):
             IoTConnection(
                 thing_name='test-thing',
@@ -91,8 +109,6 @@ class TestIoTConnection(unittest.TestCase):
 
     def test_connect_success(self):
         """Test successful connection."""
-        from cloud.iot.iot_connection import IoTConnection
-
         iot = IoTConnection(
             thing_name='test-thing',
             endpoint='test.iot.us-east-1.amazonaws.com',
@@ -102,11 +118,7 @@ class TestIoTConnection(unittest.TestCase):
         )
 
         # Simulate successful connection
-        def simulate_connect(*args, **kwargs):
-            iot._on_connect(None, None, None, 0)
-            return 0
-
-        self.mock_mqtt_client.connect.side_effect = simulate_connect
+        self.mock_mqtt_client.connect.side_effect = _fire_on_connect(iot)
 
         result = iot.connect()
 
@@ -117,8 +129,6 @@ class TestIoTConnection(unittest.TestCase):
 
     def test_publish_when_connected(self):
         """Test publishing message when connected."""
-        from cloud.iot.iot_connection import IoTConnection
-
         iot = IoTConnection(
             thing_name='test-thing',
             endpoint='test.iot.us-east-1.amazonaws.com',
@@ -147,10 +157,27 @@ class TestIoTConnection(unittest.TestCase):
         self.assertEqual(call_args[0][0], 'test/topic')
         self.assertEqual(json.loads(call_args[0][1]), payload)
 
+    def test_publish_pre_encoded_payload(self):
+        """Test pre-encoded payloads are sent without re-encoding."""
+        iot = IoTConnection(
+            thing_name='test-thing',
+            endpoint='test.iot.us-east-1.amazonaws.com',
+            cert_path=self.cert_path,
+            key_path=self.key_path,
+            root_ca_path=self.root_ca_path
+        )
+        iot.connected = True
+
+        mock_result = Mock()
+        mock_result.rc = 0
+        self.mock_mqtt_client.publish.return_value = mock_result
+
+        message = b'{"status":"online"}'
+        self.assertTrue(iot.publish('test/topic', message))
+        self.assertIs(self.mock_mqtt_client.publish.call_args[0][1], message)
+
     def test_publish_when_disconnected_queues_message(self):
         """Test publishing when disconnected queues the message."""
-        from cloud.iot.iot_connection import IoTConnection
-
         iot = IoTConnection(
             thing_name='test-thing',
             endpoint='test.iot.us-east-1.amazonaws.com',
@@ -172,8 +199,6 @@ class TestIoTConnection(unittest.TestCase):
 
     def test_subscribe(self):
         """Test topic subscription."""
-        from cloud.iot.iot_connection import IoTConnection
-
         iot = IoTConnection(
             thing_name='test-thing',
             endpoint='test.iot.us-east-1.amazonaws.com',
@@ -186,16 +211,13 @@ class TestIoTConnection(unittest.TestCase):
         iot.connected = True
 
         # Subscribe to topic
-        handler = Mock()
-        iot.subscribe('test/topic/#', handler, qos=1)
+        iot.subscribe('test/topic/#', HANDLER, qos=1)
 
         self.assertIn('test/topic/#', iot.message_handlers)
         self.mock_mqtt_client.subscribe.assert_called_once_with('test/topic/#', qos=1)
 
     def test_message_handler_called(self):
         """Test message handler is called on message receipt."""
-        from cloud.iot.iot_connection import IoTConnection
-
         iot = IoTConnection(
             thing_name='test-thing',
             endpoint='test.iot.us-east-1.amazonaws.com',
@@ -205,8 +227,7 @@ class TestIoTConnection(unittest.TestCase):
         )
 
         # Set up handler
-        handler = Mock()
-        iot.subscribe('test/topic', handler)
+        iot.subscribe('test/topic', HANDLER)
 
         # Simulate message receipt
         mock_message = Mock()
@@ -216,15 +237,13 @@ class TestIoTConnection(unittest.TestCase):
         iot._on_message(None, None, mock_message)
 
         # Verify handler was called
-        handler.assert_called_once()
-        call_args = handler.call_args[0]
+        HANDLER.assert_called_once()
+        call_args = HANDLER.call_args[0]
         self.assertEqual(call_args[0], 'test/topic')
         self.assertEqual(call_args[1], {'value': 123})
 
     def test_topic_matching_with_wildcards(self):
         """Test topic matching with wildcards."""
-        from cloud.iot.iot_connection import IoTConnection
-
         iot = IoTConnection(
             thing_name='test-thing',
             endpoint='test.iot.us-east-1.amazonaws.com',
@@ -242,10 +261,23 @@ class TestIoTConnection(unittest.TestCase):
         self.assertTrue(iot._topic_matches('devices/device1/status/battery', 'devices/#'))
         self.assertFalse(iot._topic_matches('other/device1', 'devices/#'))
 
+    def test_compiled_topic_patterns(self):
+        """Test cached compiled topic filters."""
+        single_level = _compile_topic_pattern('devices/+/status')
+        multi_level = _compile_topic_pattern('devices/#')
+        literal = _compile_topic_pattern('devices/device.1')
+
+        self.assertIs(single_level, _compile_topic_pattern('devices/+/status'))
+
+        self.assertTrue(single_level.fullmatch('devices/device1/status'))
+        self.assertFalse(single_level.fullmatch('devices/a/b/status'))
+        self.assertTrue(multi_level.fullmatch('devices/device1/status/battery'))
+        self.assertFalse(multi_level.fullmatch('devices'))
+        self.assertTrue(literal.fullmatch('devices/device.1'))
+        self.assertFalse(literal.fullmatch('devices/deviceX1'))
+
     def test_disconnect(self):
         """Test disconnect functionality."""
-        from cloud.iot.iot_connection import IoTConnection
-
         iot = IoTConnection(
             thing_name='test-thing',
             endpoint='test.iot.us-east-1.amazonaws.com',
@@ -264,8 +296,6 @@ class TestIoTConnection(unittest.TestCase):
 
     def test_get_status(self):
         """Test status reporting."""
-        from cloud.iot.iot_connection import IoTConnection
-
         iot = IoTConnection(
             thing_name='test-thing',
             endpoint='test.iot.us-east-1.amazonaws.com',
@@ -275,7 +305,7 @@ class TestIoTConnection(unittest.TestCase):
         )
 
         iot.connected = True
-        iot.subscribe('test/topic', Mock())
+        iot.subscribe('test/topic', HANDLER)
         iot.message_queue.append(('topic', {}, 1, False))
 
         status = iot.get_status()
@@ -292,13 +322,14 @@ class TestIoTConnectionEdgeCases(unittest.TestCase):
 
     def setUp(self):
         """Set up test fixtures."""
+        HANDLER.reset_mock()
+
         self.temp_dir = tempfile.mkdtemp()
         self.cert_path = os.path.join(self.temp_dir, 'cert.pem')
         self.key_path = os.path.join(self.temp_dir, 'private.key')
         self.root_ca_path = os.path.join(self.temp_dir, 'root-ca.pem')
 
-        for path in [self.cert_path, self.key_path, self.root_ca_path]:
-            Path(path).touch()
+        _create_empty_files(self.cert_path, self.key_path, self.root_ca_path)
 
         self.mqtt_patcher = patch('cloud.iot.iot_connection.mqtt.Client')
         self.mock_mqtt_class = self.mqtt_patcher.start()
@@ -308,13 +339,10 @@ class TestIoTConnectionEdgeCases(unittest.TestCase):
     def tearDown(self):
         """Clean up."""
         self.mqtt_patcher.stop()
-        import shutil
         shutil.rmtree(self.temp_dir)
 
     def test_message_queue_limit(self):
         """Test message queue has maximum size."""
-        from cloud.iot.iot_connection import IoTConnection
-
         iot = IoTConnection(
             thing_name='test-thing',
             endpoint='test.iot.us-east-1.amazonaws.com',
@@ -335,8 +363,6 @@ class TestIoTConnectionEdgeCases(unittest.TestCase):
 
     def test_invalid_json_in_message(self):
         """Test handling of invalid JSON in received message."""
-        from cloud.iot.iot_connection import IoTConnection
-
         iot = IoTConnection(
             thing_name='test-thing',
             endpoint='test.iot.us-east-1.amazonaws.com',
@@ -345,8 +371,7 @@ class TestIoTConnectionEdgeCases(unittest.TestCase):
             root_ca_path=self.root_ca_path
         )
 
-        handler = Mock()
-        iot.subscribe('test/topic', handler)
+        iot.subscribe('test/topic', HANDLER)
 
         # Simulate message with invalid JSON
         mock_message = Mock()
@@ -357,7 +382,7 @@ class TestIoTConnectionEdgeCases(unittest.TestCase):
         iot._on_message(None, None, mock_message)
 
         # Handler should not be called
-        handler.assert_not_called()
+        HANDLER.assert_not_called()
 
 
 if __name__ == '__main__':
@@ -9,6 +9,8 @@ import pytest
 import unittest
 from unittest.mock import Mock, MagicMock, patch
 import json
+import sys
+import threading
 import time
 from datetime import datetime
 
@@ -101,7 +103,7 @@ class TestTelemetryPublisher(unittest.TestCase):
             'action': 'anc_bypassed'
         }
 
-        telemetry.publish_emergency_event(event)
+        telemetry.publish_emergency_event(event, sync=True)
 
         # Should publish immediately, not batch
         self.mock_iot.publish.assert_called_once()
@@ -112,6 +114,80 @@ class TestTelemetryPublisher(unittest.TestCase):
         # Should increment published count
         self.assertEqual(telemetry.stats['total_published'], 1)
 
+    def test_emergency_event_non_blocking(self):
+        """Test emergency events do not block the caller on a slow publish."""
+        from cloud.iot.telemetry_publisher import TelemetryPublisher
+
+        published = threading.Event()
+
+        def slow_publish(topic, payload, qos=0):
+            time.sleep(0.5)
+            published.set()
+            return True
+
+        self.mock_iot.publish.side_effect = slow_publish
+
+        telemetry = TelemetryPublisher(self.mock_iot, 'test-device')
+        # Start the sender up front so only the enqueue is timed
+        telemetry._ensure_emergency_sender()
+
+        start = time.monotonic()
+        telemetry.publish_emergency_event({'is_emergency': True, 'predicted_class': 'fire_alarm'})
+        self.assertLess(time.monotonic() - start, 0.1)
+        self.assertEqual(telemetry.stats['total_emergency_enqueued'], 1)
+
+        # Sent in the background on the emergency topic with QoS 1
+        self.assertTrue(published.wait(timeout=2))
+        call = self.mock_iot.publish.call_args
+        self.assertIn('/emergency', call[0][0])
+        self.assertEqual(call[1]['qos'], 1)
+
+    def test_stop_publishing_stops_emergency_sender(self):
+        """Test stop_publishing sends queued events and joins the sender thread."""
+        from cloud.iot.telemetry_publisher import TelemetryPublisher
+
+        self.mock_iot.publish.return_value = True
+
+        telemetry = TelemetryPublisher(self.mock_iot, 'test-device')
+        for _ in range(3):
+            telemetry.publish_emergency_event({'is_emergency': True})
+        sender = telemetry._emergency_thread
+
+        telemetry.stop_publishing()
+
+        self.assertFalse(sender.is_alive())
+        self.assertIsNone(telemetry._emergency_thread)
+        self.assertEqual(self.mock_iot.publish.call_count, 3)
+        self.assertEqual(telemetry.stats['total_published'], 3)
+
+    def test_stop_timeout_leaves_sentinel_for_busy_sender(self):
+        """Test a timed-out stop does not drain the queue under a busy sender."""
+        from cloud.iot.telemetry_publisher import TelemetryPublisher
+
+        release = threading.Event()
+
+        def blocked_publish(topic, payload, qos=0):
+            release.wait(timeout=5)
+            return True
+
+        self.mock_iot.publish.side_effect = blocked_publish
+
+        telemetry = TelemetryPublisher(self.mock_iot, 'test-device')
+        telemetry.publish_emergency_event({'is_emergency': True})
+        telemetry.publish_emergency_event({'is_emergency': True})
+        sender = telemetry._emergency_thread
+
+        self.assertFalse(telemetry._stop_emergency_sender(timeout=0.05))
+        self.assertTrue(sender.is_alive())
+        self.assertIs(telemetry._emergency_thread, sender)
+
+        # Once unblocked the sender sends the rest and exits on its sentinel
+        release.set()
+        sender.join(timeout=2)
+        self.assertFalse(sender.is_alive())
+        self.assertEqual(self.mock_iot.publish.call_count, 2)
+        self.assertTrue(telemetry._emergency_queue.empty())
+
     def test_batch_publishing_when_full(self):
         """Test batch is published when full."""
         from cloud.iot.telemetry_publisher import TelemetryPublisher
@@ -122,8 +198,9 @@ class TestTelemetryPublisher(unittest.TestCase):
         for i in range(3):
             telemetry.publish_anc_metrics({'value': i})
 
-        # Should have published batch
-        self.assertEqual(self.mock_iot.publish.call_count, 3)
+        # Should have published the batch as a single message
+        self.assertEqual(self.mock_iot.publish.call_count, 1)
+        self.assertEqual(self.mock_iot.publish.call_args[0][1]['count'], 3)
         self.assertEqual(len(telemetry.batch_buffer), 0)
         self.assertEqual(telemetry.stats['total_published'], 3)
 
@@ -168,8 +245,9 @@ class TestTelemetryPublisher(unittest.TestCase):
         # Flush manually
         telemetry.flush()
 
-        # Should have published all buffered metrics
-        self.assertEqual(self.mock_iot.publish.call_count, 5)
+        # Should have published all buffered metrics in one message
+        self.assertEqual(self.mock_iot.publish.call_count, 1)
+        self.assertEqual(len(self.mock_iot.publish.call_args[0][1]['batch']), 5)
         self.assertEqual(len(telemetry.batch_buffer), 0)
 
     def test_get_statistics(self):
@@ -209,6 +287,40 @@ class TestTelemetryPublisher(unittest.TestCase):
         # Should have published during stop
         self.assertEqual(len(telemetry.batch_buffer), 0)
 
+    def test_publisher_does_not_drift_under_slow_flush(self):
+        """Test the publish period stays pinned to batch_interval."""
+        from cloud.iot.telemetry_publisher import TelemetryPublisher
+
+        telemetry = TelemetryPublisher(self.mock_iot, 'test-device', batch_interval=0.25)
+        telemetry.publish_anc_metrics({'value': 1})
+
+        # Fake clock: sleeping and publishing both just advance it
+        now = [0.0]
+        sleeps = []
+        flush_times = []
+
+        def fake_sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        def slow_flush():
+            flush_times.append(now[0])
+            now[0] += 0.125  # Half the interval spent publishing
+            if len(flush_times) == 4:
+                telemetry.running = False
+
+        fake_time = MagicMock()
+        fake_time.monotonic.side_effect = lambda: now[0]
+        fake_time.sleep.side_effect = fake_sleep
+
+        with patch('cloud.iot.telemetry_publisher.time', fake_time), \
+             patch.object(telemetry, '_publish_batch', side_effect=slow_flush):
+            telemetry.running = True
+            telemetry._publish_loop()
+
+        self.assertEqual(flush_times, [0.25, 0.5, 0.75, 1.0])
+        self.assertEqual(sleeps, [0.25, 0.125, 0.125, 0.125])
+
 
 class TestTelemetryPublisherEdgeCases(unittest.TestCase):
     """Test edge cases for telemetry publisher."""
@@ -217,6 +329,88 @@ class TestTelemetryPublisherEdgeCases(unittest.TestCase):
         """Set up test fixtures."""
         self.mock_iot = MagicMock()
 
+    def test_buffer_drops_oldest_when_overrun(self):
+        """Test the batch buffer is bounded and drops the oldest metrics."""
+        from cloud.iot.telemetry_publisher import TelemetryPublisher
+
+        # Batch size above the buffer size so nothing is published
+        telemetry = TelemetryPublisher(
+            self.mock_iot, 'test-device', batch_size=100, max_buffer_size=10
+        )
+
+        for i in range(15):
+            telemetry.publish_anc_metrics({'value': i})
+
+        self.mock_iot.publish.assert_not_called()
+        self.assertEqual(len(telemetry.batch_buffer), 10)
+        self.assertEqual(telemetry.stats['total_dropped'], 5)
+        self.assertEqual(telemetry.batch_buffer[0][1]['metrics']['value'], 5)
+
+    def test_aggregation_mode_collapses_events(self):
+        """Test aggregation mode flushes one summary record per metric key."""
+        from cloud.iot.telemetry_publisher import TelemetryPublisher
+
+        self.mock_iot.publish.return_value = True
+
+        telemetry = TelemetryPublisher(
+            self.mock_iot, 'test-device', batch_size=10, aggregate=True
+        )
+
+        for i in range(1000):
+            telemetry.publish_anc_metrics({'latency_ms': i, 'algorithm': 'nlms'})
+
+        # Nothing is buffered or published until the flush
+        self.assertEqual(len(telemetry.batch_buffer), 0)
+        self.mock_iot.publish.assert_not_called()
+
+        telemetry.flush()
+
+        self.mock_iot.publish.assert_called_once()
+        message = self.mock_iot.publish.call_args[0][1]
+        self.assertEqual(message['count'], 1)
+
+        record = message['batch'][0]
+        self.assertEqual(record['metric'], 'latency_ms')
+        self.assertEqual(record['count'], 1000)
+        self.assertEqual(record['min'], 0)
+        self.assertEqual(record['max'], 999)
+        self.assertAlmostEqual(record['avg'], 499.5)
+        self.assertEqual(telemetry.stats['total_published'], 1)
+
+    def test_aggregate_overflow_counts_drops(self):
+        """Test summary records that overflow the buffer are counted as dropped."""
+        from cloud.iot.telemetry_publisher import TelemetryPublisher
+
+        self.mock_iot.publish.return_value = True
+
+        telemetry = TelemetryPublisher(
+            self.mock_iot, 'test-device', max_buffer_size=2, aggregate=True
+        )
+        telemetry.publish_anc_metrics({'a': 1, 'b': 2, 'c': 3})
+
+        telemetry.flush()
+
+        message = self.mock_iot.publish.call_args[0][1]
+        self.assertEqual([r['metric'] for r in message['batch']], ['b', 'c'])
+        self.assertEqual(telemetry.stats['total_dropped'], 1)
+
+    def test_disabled_publisher_is_noop(self):
+        """Test a disabled publisher drops every call without buffering."""
+        from cloud.iot.telemetry_publisher import TelemetryPublisher
+
+        telemetry = TelemetryPublisher(
+            self.mock_iot, 'test-device', batch_size=10, enabled=False
+        )
+
+        for i in range(1000):
+            telemetry.publish_anc_metrics({'value': i})
+        telemetry.publish_emergency_event({'is_emergency': True}, sync=True)
+        telemetry.flush()
+
+        self.assertEqual(self.mock_iot.publish.call_count, 0)
+        self.assertEqual(len(telemetry.batch_buffer), 0)
+        self.assertEqual(telemetry.stats['total_buffered'], 0)
+
     def test_publish_failure_increments_failed_count(self):
         """Test failed publishes are counted."""
         from cloud.iot.telemetry_publisher import TelemetryPublisher
@@ -245,7 +439,7 @@ class TestTelemetryPublisherEdgeCases(unittest.TestCase):
             'predicted_class': 'fire_alarm'
         }
 
-        telemetry.publish_emergency_event(event)
+        telemetry.publish_emergency_event(event, sync=True)
 
         # Should increment failed count
         self.assertEqual(telemetry.stats['total_failed'], 1)
@@ -284,13 +478,16 @@ class TestTelemetryPublisherEdgeCases(unittest.TestCase):
         metrics = {'latency_ms': 35.2}
         telemetry.publish_anc_metrics(metrics)
 
-        # Get published payload
+        # Get published payload from the batch message
         call_args = self.mock_iot.publish.call_args[0]
-        payload = call_args[1]
+        message = call_args[1]
+        self.assertEqual(message['count'], 1)
+        self.assertIn('timestamp', message)
+        payload = message['batch'][0]
 
         self.assertEqual(payload['device_id'], 'test-device')
         self.assertEqual(payload['metric_type'], 'anc')
-        self.assertIn('timestamp', payload)
+        self.assertIsInstance(payload['timestamp_ns'], int)
         self.assertEqual(payload['metrics'], metrics)
 
 
@@ -315,6 +512,101 @@ class TestTelemetryPublisherConcurrency(unittest.TestCase):
         # All should be buffered
         self.assertEqual(len(telemetry.batch_buffer), 20)
 
+    def test_multithreaded_producers_lose_no_metrics(self):
+        """Producers on several threads never race the batch flush."""
+        from cloud.iot.telemetry_publisher import TelemetryPublisher
+
+        published = []
+        published_lock = threading.Lock()
+
+        def publish(topic, message, qos=0):
+            with published_lock:
+                published.append(message['count'])
+            return True
+
+        self.mock_iot.publish.side_effect = publish
+        telemetry = TelemetryPublisher(
+            self.mock_iot, 'test-device', batch_size=50, max_buffer_size=10000
+        )
+
+        threads_count, per_thread = 4, 5000
+        barrier = threading.Barrier(threads_count)
+        errors = []
+
+        def produce():
+            barrier.wait()
+            try:
+                for i in range(per_thread):
+                    telemetry.publish_anc_metrics({'value': i})
+            except Exception as e:
+                errors.append(e)
+
+        # Switch threads aggressively so producers interleave with flushes
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [threading.Thread(target=produce) for _ in range(threads_count)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        finally:
+            sys.setswitchinterval(interval)
+
+        self.assertEqual(errors, [])
+        total = threads_count * per_thread
+        self.assertEqual(sum(published) + len(telemetry.batch_buffer), total)
+        self.assertEqual(telemetry.stats['total_published'] + len(telemetry.batch_buffer), total)
+        self.assertEqual(telemetry.stats['total_dropped'], 0)
+
+    def test_aggregating_producers_race_flushes_safely(self):
+        """Aggregate updates from several threads never race the flush."""
+        from cloud.iot.telemetry_publisher import TelemetryPublisher
+
+        telemetry = TelemetryPublisher(self.mock_iot, 'test-device', aggregate=True)
+
+        threads_count, per_thread = 4, 2000
+        barrier = threading.Barrier(threads_count + 1)
+        errors = []
+
+        def produce(worker):
+            barrier.wait()
+            try:
+                for i in range(per_thread):
+                    # New keys keep appearing while the flusher drains
+                    telemetry.publish_anc_metrics({f'w{worker}_m{i % 50}': i})
+            except Exception as e:
+                errors.append(e)
+
+        def flush():
+            barrier.wait()
+            try:
+                while any(t.is_alive() for t in producers):
+                    telemetry.flush()
+            except Exception as e:
+                errors.append(e)
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            producers = [threading.Thread(target=produce, args=(w,)) for w in range(threads_count)]
+            flusher = threading.Thread(target=flush)
+            for t in producers + [flusher]:
+                t.start()
+            for t in producers + [flusher]:
+                t.join()
+        finally:
+            sys.setswitchinterval(interval)
+        telemetry.flush()
+
+        self.assertEqual(errors, [])
+        summed = sum(
+            record['count']
+            for call in self.mock_iot.publish.call_args_list
+            for record in call[0][1]['batch']
+        )
+        self.assertEqual(summed, threads_count * per_thread)
+
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
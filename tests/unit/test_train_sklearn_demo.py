@@ -25,6 +25,9 @@ class TestDataPathUtilities(unittest.TestCase):
 
     def tearDown(self):
         """Clean up."""
+        from scripts.training.train_sklearn_demo import _find_data_file_in
+
+        _find_data_file_in.cache_clear()
         os.chdir(self.original_dir)
         import shutil
         shutil.rmtree(self.temp_dir)
@@ -92,8 +95,9 @@ class TestSyntheticDataGeneration(unittest.TestCase):
         self.assertEqual(len(data['labels']), 120)
         self.assertEqual(len(data['recording_ids']), 120)
 
-        # Check feature dimension
+        # Check feature dimension and dtype
         self.assertEqual(data['features'].shape[1], 168)
+        self.assertEqual(data['features'].dtype, np.float32)
 
     def test_generate_synthetic_data_custom_size(self):
         """Test generating synthetic data with custom size."""
@@ -129,9 +133,8 @@ class TestSyntheticDataGeneration(unittest.TestCase):
         """Test that synthetic data is shuffled."""
         from scripts.training.train_sklearn_demo import generate_synthetic_data
 
-        # Set seed for reproducibility
-        np.random.seed(42)
-        data1 = generate_synthetic_data(num_samples_per_class=5)
+        # Seed for reproducibility
+        data1 = generate_synthetic_data(num_samples_per_class=5, seed=42)
 
         # First few labels shouldn't all be the same (due to shuffling)
         labels = data1['labels'][:10]
@@ -143,6 +146,18 @@ class TestSyntheticDataGeneration(unittest.TestCase):
 class TestTrainClassifierFunction(unittest.TestCase):
     """Test train_sklearn_classifier function."""
 
+    def setUp(self):
+        """Run in a scratch directory: training saves its model to the cwd."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_dir = os.getcwd()
+        os.chdir(self.temp_dir)
+
+    def tearDown(self):
+        """Clean up."""
+        os.chdir(self.original_dir)
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
     @patch('scripts.training.train_sklearn_demo.find_data_file')
     @patch('scripts.training.train_sklearn_demo.generate_synthetic_data')
     def test_uses_synthetic_when_no_data_file(self, mock_generate, mock_find):
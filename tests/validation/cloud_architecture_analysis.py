@@ -14,24 +14,138 @@ Validates cloud architecture for:
 8. Security misconfigurations
 """
 
+import io
+import mmap
 import os
 import re
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import Iterator, List, Dict, Tuple
+
+_RE_HANDLER_BODY = re.compile(rb'def lambda_handler.*?(?=\ndef |\Z)', re.DOTALL)
+_RE_BARE_EXCEPT = re.compile(rb'except\s*:')
+_RE_NP_ALLOC = re.compile(rb'np\.(?:zeros|ones)\((\d+)')
+# DynamoDB Terraform keywords, found in one pass; only "ttl" is case-insensitive
+_RE_DYNAMODB_KEYWORDS = re.compile(rb'billing_mode|PAY_PER_REQUEST|point_in_time_recovery|(?i:ttl)')
+_RE_DEAD_LETTER = re.compile(rb'dead_letter', re.IGNORECASE)
+_RE_THROTTLE = re.compile(rb'throttle', re.IGNORECASE)
+
+# Every keyword the handler checks look for, matched in a single pass.
+# Longer keywords come first so e.g. "boto3.client" wins over "boto3";
+# the checks below treat a longer match as implying its prefix.
+_HANDLER_KEYWORDS = (
+    b"boto3.client", b"boto3.resource", b"boto3",
+    b"import tensorflow", b"import torch",
+    b"def lambda_handler",
+    b"Config(", b"connect_timeout", b"read_timeout",
+    b"with open", b"open(",
+    b"get_required_env", b"os.environ.get", b"os.environ",
+)
+_RE_HANDLER_KEYWORDS = re.compile(
+    b'|'.join(re.escape(kw) for kw in sorted(_HANDLER_KEYWORDS, key=len, reverse=True))
+)
+
+
+@contextmanager
+def _mapped(path: str):
+    """Map a file read-only so checks can search its bytes without decoding."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+def _contains(buf, *needles: bytes) -> bool:
+    """True if any needle occurs in buf (bytes or mmap)."""
+    return any(buf.find(needle) >= 0 for needle in needles)
+
+
+@dataclass(frozen=True)
+class HandlerScan:
+    """Facts about a Lambda handler source, gathered in one pass."""
+    has_boto3: bool
+    boto3_client_or_resource: bool
+    boto3_in_handler: bool
+    heavy_ml_import: bool
+    bare_excepts: int
+    has_handler: bool
+    handler_has_try: bool
+    has_boto_config: bool
+    has_connect_and_read_timeout: bool
+    np_alloc_sizes: Tuple[int, ...]
+    opens_without_with: bool
+    uses_environ: bool
+    validates_env: bool
+
+
+@lru_cache(maxsize=None)
+def _scan_handler(path: str) -> HandlerScan:
+    """Scan a handler's source once for everything the _check_* helpers need."""
+    with _mapped(path) as content:
+        found = {m.group(0) for m in _RE_HANDLER_KEYWORDS.finditer(content)}
+        handler_match = _RE_HANDLER_BODY.search(content)
+        handler_body = handler_match.group(0) if handler_match else None
+
+        boto3_client_or_resource = bool(found & {b"boto3.client", b"boto3.resource"})
+
+        return HandlerScan(
+            has_boto3=boto3_client_or_resource or b"boto3" in found,
+            boto3_client_or_resource=boto3_client_or_resource,
+            boto3_in_handler=handler_body is not None and _contains(
+                handler_body, b"boto3.client", b"boto3.resource"
+            ),
+            heavy_ml_import=bool(found & {b"import tensorflow", b"import torch"}),
+            bare_excepts=len(_RE_BARE_EXCEPT.findall(content)),
+            has_handler=b"def lambda_handler" in found,
+            handler_has_try=handler_body is not None and _contains(handler_body, b"try:"),
+            has_boto_config=b"Config(" in found,
+            has_connect_and_read_timeout={b"connect_timeout", b"read_timeout"} <= found,
+            np_alloc_sizes=tuple(int(size) for size in _RE_NP_ALLOC.findall(content)),
+            opens_without_with=b"open(" in found and b"with open" not in found,
+            uses_environ=bool(found & {b"os.environ", b"os.environ.get"}),
+            validates_env=bool(found & {b"get_required_env", b"os.environ.get"}),
+        )
+
 
 class CloudArchitectureAnalyzer:
     """Analyzes cloud architecture for production readiness."""
 
-    def __init__(self):
+    def __init__(self, root: str = "cloud"):
         self.issues = []
         self.warnings = []
         self.recommendations = []
+        # Walk the cloud tree once; every existence check and file search
+        # below is answered from this directory -> file names map
+        self._tree = {dirpath: filenames for dirpath, _, filenames in os.walk(root)}
+
+    def _dir_exists(self, path: str) -> bool:
+        """True if path is a directory in the cached tree."""
+        return os.path.normpath(path) in self._tree
+
+    def _file_exists(self, path: str) -> bool:
+        """True if path is a file in the cached tree."""
+        dirname, filename = os.path.split(os.path.normpath(path))
+        return filename in self._tree.get(dirname, ())
+
+    def _files_under(self, root: str, name: str = None, suffix: str = None) -> Iterator[str]:
+        """Yield cached files below root matching name or suffix, in walk order."""
+        root = os.path.normpath(root)
+        prefix = root + os.sep
+        for dirpath, filenames in self._tree.items():
+            if dirpath != root and not dirpath.startswith(prefix):
+                continue
+            for filename in filenames:
+                if filename == name or (suffix and filename.endswith(suffix)):
+                    yield os.path.join(dirpath, filename)
 
     def analyze_all(self):
         """Run all analysis checks."""
-        print("\n" + "="*80)
-        print("CLOUD ARCHITECTURE CRITICAL ANALYSIS")
-        print("="*80)
+        print("\n" + "="*80 + "\nCLOUD ARCHITECTURE CRITICAL ANALYSIS\n" + "="*80)
 
         # Lambda analysis
         self.analyze_lambda_functions()
@@ -53,51 +167,44 @@ class CloudArchitectureAnalyzer:
 
     def analyze_lambda_functions(self):
         """Analyze Lambda functions for critical issues."""
-        print("\n" + "-"*80)
-        print("1. LAMBDA FUNCTIONS ANALYSIS")
-        print("-"*80)
+        print("\n" + "-"*80 + "\n1. LAMBDA FUNCTIONS ANALYSIS\n" + "-"*80)
 
-        lambda_dir = Path("cloud/lambda")
-        if not lambda_dir.exists():
+        lambda_dir = "cloud/lambda"
+        if not self._dir_exists(lambda_dir):
             self.issues.append("Lambda directory not found")
             return
 
-        for handler_file in lambda_dir.rglob("handler.py"):
-            function_name = handler_file.parent.name
+        for handler_file in self._files_under(lambda_dir, name="handler.py"):
+            function_name = os.path.basename(os.path.dirname(handler_file))
             print(f"\n  Analyzing: {function_name}")
 
-            content = handler_file.read_text()
+            scan = _scan_handler(handler_file)
 
             # Check for cold start optimization
-            self._check_cold_start(function_name, content)
+            self._check_cold_start(function_name, scan)
 
             # Check for proper error handling
-            self._check_error_handling(function_name, content)
+            self._check_error_handling(function_name, scan)
 
             # Check for timeout configuration
-            self._check_lambda_timeouts(function_name, content)
+            self._check_lambda_timeouts(function_name, scan)
 
             # Check for memory efficiency
-            self._check_memory_usage(function_name, content)
+            self._check_memory_usage(function_name, scan)
 
             # Check for environment variable validation
-            self._check_env_vars(function_name, content)
+            self._check_env_vars(function_name, scan)
 
-    def _check_cold_start(self, function_name: str, content: str):
+    def _check_cold_start(self, function_name: str, scan: HandlerScan):
         """Check for cold start optimization."""
         issues = []
 
-        # Check if boto3 clients are initialized outside handler
-        if "boto3.client" in content or "boto3.resource" in content:
-            # Find if they're inside lambda_handler
-            handler_match = re.search(r'def lambda_handler.*?(?=\ndef |\Z)', content, re.DOTALL)
-            if handler_match:
-                handler_content = handler_match.group(0)
-                if "boto3.client" in handler_content or "boto3.resource" in handler_content:
-                    issues.append(f"Boto3 clients initialized inside handler (cold start penalty)")
+        # Check if boto3 clients are initialized inside lambda_handler
+        if scan.boto3_client_or_resource and scan.boto3_in_handler:
+            issues.append(f"Boto3 clients initialized inside handler (cold start penalty)")
 
         # Check for heavy imports
-        if "import tensorflow" in content or "import torch" in content:
+        if scan.heavy_ml_import:
             issues.append(f"Heavy ML framework imported (severe cold start penalty)")
 
         if issues:
@@ -107,20 +214,17 @@ class CloudArchitectureAnalyzer:
         else:
             print(f"    ✅ Cold start optimized")
 
-    def _check_error_handling(self, function_name: str, content: str):
+    def _check_error_handling(self, function_name: str, scan: HandlerScan):
         """Check for proper error handling."""
         issues = []
 
         # Check for bare except clauses
-        bare_except = re.findall(r'except\s*:', content)
-        if bare_except:
-            issues.append(f"Found {len(bare_except)} bare except clauses (hides errors)")
+        if scan.bare_excepts:
+            issues.append(f"Found {scan.bare_excepts} bare except clauses (hides errors)")
 
         # Check if lambda_handler has try-except
-        if "def lambda_handler" in content:
-            handler_match = re.search(r'def lambda_handler.*?(?=\ndef |\Z)', content, re.DOTALL)
-            if handler_match and "try:" not in handler_match.group(0):
-                issues.append(f"No try-except in lambda_handler (unhandled exceptions)")
+        if scan.has_handler and not scan.handler_has_try:
+            issues.append(f"No try-except in lambda_handler (unhandled exceptions)")
 
         if issues:
             for issue in issues:
@@ -129,46 +233,42 @@ class CloudArchitectureAnalyzer:
         else:
             print(f"    ✅ Error handling proper")
 
-    def _check_lambda_timeouts(self, function_name: str, content: str):
+    def _check_lambda_timeouts(self, function_name: str, scan: HandlerScan):
         """Check for timeout configuration."""
         # Check if boto3 config has timeouts
-        if "Config(" in content:
-            if "connect_timeout" in content and "read_timeout" in content:
+        if scan.has_boto_config:
+            if scan.has_connect_and_read_timeout:
                 print(f"    ✅ Boto3 timeouts configured")
             else:
                 print(f"    ⚠️  {function_name}: Partial timeout config")
                 self.warnings.append(f"{function_name}: Missing some timeout configs")
         else:
-            if "boto3" in content:
+            if scan.has_boto3:
                 print(f"    ❌ {function_name}: No boto3 timeout configuration")
                 self.issues.append(f"{function_name}: No boto3 timeouts (can hang)")
 
-    def _check_memory_usage(self, function_name: str, content: str):
+    def _check_memory_usage(self, function_name: str, scan: HandlerScan):
         """Check for potential memory issues."""
         issues = []
 
-        # Check for large in-memory operations
-        if "np.zeros(" in content or "np.ones(" in content:
-            # Look for large array allocations
-            large_array = re.findall(r'np\.(?:zeros|ones)\((\d+)', content)
-            for size in large_array:
-                if int(size) > 1000000:  # 1M elements
-                    issues.append(f"Large array allocation ({size} elements)")
+        # Look for large array allocations
+        for size in scan.np_alloc_sizes:
+            if size > 1000000:  # 1M elements
+                issues.append(f"Large array allocation ({size} elements)")
 
         # Check for file operations without cleanup
-        if "open(" in content:
-            if "with open" not in content:
-                issues.append(f"File opened without 'with' statement (leak risk)")
+        if scan.opens_without_with:
+            issues.append(f"File opened without 'with' statement (leak risk)")
 
         if issues:
             for issue in issues:
                 print(f"    ⚠️  {function_name}: {issue}")
                 self.warnings.append(f"{function_name}: {issue}")
 
-    def _check_env_vars(self, function_name: str, content: str):
+    def _check_env_vars(self, function_name: str, scan: HandlerScan):
         """Check environment variable validation."""
-        if "os.environ" in content:
-            if "get_required_env" in content or "os.environ.get" in content:
+        if scan.uses_environ:
+            if scan.validates_env:
                 print(f"    ✅ Environment variables validated")
             else:
                 print(f"    ❌ {function_name}: Direct env access without validation")
@@ -176,62 +276,65 @@ class CloudArchitectureAnalyzer:
 
     def analyze_dynamodb_tables(self):
         """Analyze DynamoDB table configurations."""
-        print("\n" + "-"*80)
-        print("2. DYNAMODB TABLES ANALYSIS")
-        print("-"*80)
+        print("\n" + "-"*80 + "\n2. DYNAMODB TABLES ANALYSIS\n" + "-"*80)
 
-        terraform_files = list(Path("cloud/terraform/modules/dynamodb").rglob("*.tf"))
+        terraform_files = list(self._files_under("cloud/terraform/modules/dynamodb", suffix=".tf"))
 
         if not terraform_files:
             print("    ⚠️  DynamoDB Terraform module not found")
             return
 
         for tf_file in terraform_files:
-            content = tf_file.read_text()
+            with _mapped(tf_file) as content:
+                self._check_dynamodb_table(content)
 
-            # Check for on-demand billing
-            if "billing_mode" in content:
-                if "PAY_PER_REQUEST" in content:
-                    print(f"    ✅ On-demand billing configured")
-                else:
-                    print(f"    ⚠️  Using provisioned capacity (cost risk)")
-                    self.warnings.append("DynamoDB: Provisioned capacity can be expensive")
+    def _check_dynamodb_table(self, content):
+        """Check one DynamoDB Terraform file (bytes or mmap)."""
+        found = {m.group(0) for m in _RE_DYNAMODB_KEYWORDS.finditer(content)}
 
-            # Check for point-in-time recovery
-            if "point_in_time_recovery" in content:
-                print(f"    ✅ Point-in-time recovery enabled")
+        # Check for on-demand billing
+        if b"billing_mode" in found:
+            if b"PAY_PER_REQUEST" in found:
+                print(f"    ✅ On-demand billing configured")
             else:
-                print(f"    ❌ No point-in-time recovery (data loss risk)")
-                self.issues.append("DynamoDB: No PITR enabled")
+                print(f"    ⚠️  Using provisioned capacity (cost risk)")
+                self.warnings.append("DynamoDB: Provisioned capacity can be expensive")
 
-            # Check for TTL
-            if "ttl" in content.lower():
-                print(f"    ✅ TTL configured for data cleanup")
-            else:
-                print(f"    ⚠️  No TTL (table will grow unbounded)")
-                self.warnings.append("DynamoDB: No TTL for old data cleanup")
+        # Check for point-in-time recovery
+        if b"point_in_time_recovery" in found:
+            print(f"    ✅ Point-in-time recovery enabled")
+        else:
+            print(f"    ❌ No point-in-time recovery (data loss risk)")
+            self.issues.append("DynamoDB: No PITR enabled")
+
+        # Check for TTL
+        if any(kw.lower() == b"ttl" for kw in found):
+            print(f"    ✅ TTL configured for data cleanup")
+        else:
+            print(f"    ⚠️  No TTL (table will grow unbounded)")
+            self.warnings.append("DynamoDB: No TTL for old data cleanup")
 
     def analyze_sqs_queues(self):
         """Analyze SQS queue configurations."""
-        print("\n" + "-"*80)
-        print("3. SQS QUEUES ANALYSIS")
-        print("-"*80)
+        print("\n" + "-"*80 + "\n3. SQS QUEUES ANALYSIS\n" + "-"*80)
 
         # Check if audio_receiver uses SQS
-        audio_receiver = Path("cloud/lambda/audio_receiver/handler.py")
-        if audio_receiver.exists():
-            content = audio_receiver.read_text()
+        audio_receiver = "cloud/lambda/audio_receiver/handler.py"
+        if self._file_exists(audio_receiver):
+            with _mapped(audio_receiver) as content:
+                sends_to_sqs = _contains(content, b"sqs.send_message")
 
-            if "sqs.send_message" in content:
+            if sends_to_sqs:
                 print(f"    ✅ Using SQS for async processing")
 
                 # Check for dead letter queue
-                terraform_sqs = Path("cloud/terraform/modules/sqs")
-                if terraform_sqs.exists():
-                    sqs_tf = list(terraform_sqs.rglob("*.tf"))
+                terraform_sqs = "cloud/terraform/modules/sqs"
+                if self._dir_exists(terraform_sqs):
+                    sqs_tf = next(self._files_under(terraform_sqs, suffix=".tf"), None)
                     if sqs_tf:
-                        tf_content = sqs_tf[0].read_text()
-                        if "dead_letter" in tf_content.lower():
+                        with _mapped(sqs_tf) as tf_content:
+                            has_dlq = _RE_DEAD_LETTER.search(tf_content) is not None
+                        if has_dlq:
                             print(f"    ✅ Dead letter queue configured")
                         else:
                             print(f"    ❌ No dead letter queue (lost messages)")
@@ -244,12 +347,10 @@ class CloudArchitectureAnalyzer:
 
     def analyze_iot_core(self):
         """Analyze IoT Core configuration."""
-        print("\n" + "-"*80)
-        print("4. IOT CORE ANALYSIS")
-        print("-"*80)
+        print("\n" + "-"*80 + "\n4. IOT CORE ANALYSIS\n" + "-"*80)
 
         iot_connection = Path("cloud/iot/iot_connection.py")
-        if iot_connection.exists():
+        if self._file_exists(str(iot_connection)):
             content = iot_connection.read_text()
 
             # Check for reconnection logic
@@ -271,21 +372,20 @@ class CloudArchitectureAnalyzer:
 
     def analyze_api_gateway(self):
         """Analyze API Gateway configuration."""
-        print("\n" + "-"*80)
-        print("5. API GATEWAY ANALYSIS")
-        print("-"*80)
+        print("\n" + "-"*80 + "\n5. API GATEWAY ANALYSIS\n" + "-"*80)
 
         # Check for throttling configuration
-        terraform_api = Path("cloud/terraform/modules/api_gateway_websocket")
-        if terraform_api.exists():
+        terraform_api = "cloud/terraform/modules/api_gateway_websocket"
+        if self._dir_exists(terraform_api):
             print(f"    ✅ API Gateway WebSocket module exists")
 
-            tf_files = list(terraform_api.rglob("*.tf"))
-            if tf_files:
-                content = tf_files[0].read_text()
+            tf_file = next(self._files_under(terraform_api, suffix=".tf"), None)
+            if tf_file:
+                with _mapped(tf_file) as content:
+                    has_throttle = _RE_THROTTLE.search(content) is not None
 
                 # Check for throttling
-                if "throttle" in content.lower():
+                if has_throttle:
                     print(f"    ✅ Throttling configured")
                 else:
                     print(f"    ⚠️  No throttling (DoS risk)")
@@ -296,31 +396,34 @@ class CloudArchitectureAnalyzer:
 
     def print_summary(self):
         """Print analysis summary."""
-        print("\n" + "="*80)
-        print("ANALYSIS SUMMARY")
-        print("="*80)
+        buf = io.StringIO()
 
-        print(f"\n❌ CRITICAL ISSUES: {len(self.issues)}")
+        print("\n" + "="*80 + "\nANALYSIS SUMMARY\n" + "="*80, file=buf)
+
+        print(f"\n❌ CRITICAL ISSUES: {len(self.issues)}", file=buf)
         for issue in self.issues:
-            print(f"  - {issue}")
+            print(f"  - {issue}", file=buf)
 
-        print(f"\n⚠️  WARNINGS: {len(self.warnings)}")
+        print(f"\n⚠️  WARNINGS: {len(self.warnings)}", file=buf)
         for warning in self.warnings:
-            print(f"  - {warning}")
+            print(f"  - {warning}", file=buf)
 
         if self.recommendations:
-            print(f"\n💡 RECOMMENDATIONS: {len(self.recommendations)}")
+            print(f"\n💡 RECOMMENDATIONS: {len(self.recommendations)}", file=buf)
             for rec in self.recommendations:
-                print(f"  - {rec}")
+                print(f"  - {rec}", file=buf)
 
-        print("\n" + "="*80)
+        print("\n" + "="*80, file=buf)
 
-        if len(self.issues) == 0:
-            print("✅ NO CRITICAL ISSUES FOUND")
-            return True
+        ok = len(self.issues) == 0
+        if ok:
+            print("✅ NO CRITICAL ISSUES FOUND", file=buf)
         else:
-            print(f"❌ {len(self.issues)} CRITICAL ISSUES REQUIRE FIXES")
-            return False
+            print(f"❌ {len(self.issues)} CRITICAL ISSUES REQUIRE FIXES", file=buf)
+
+        # One write for the whole summary instead of a syscall per line
+        sys.stdout.write(buf.getvalue())
+        return ok
 
 
 def main():
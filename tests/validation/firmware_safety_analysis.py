@@ -12,9 +12,119 @@ Validates firmware for:
 6. Deterministic execution
 """
 
+import io
+import mmap
+import os
 import re
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, FrozenSet, Optional, Tuple
+
+# Compiled once at import; every analyzer reuses these instead of passing
+# pattern strings to re.* on each call. Patterns are bytes so they run
+# directly over the mmap'd source without decoding it.
+_RE_MALLOC = re.compile(rb'malloc\s*\([^)]+\)')
+_RE_BUFFER_DECL = re.compile(rb'(float|int|uint32_t)\s+(\w+)\s*\[(\d+)\]')
+_RE_ARRAY_ACCESS = re.compile(rb'(\w+)\s*\[([^\]]+)\]')
+_RE_BOUNDS_CHECK = re.compile(rb'if\s*\([^<]+<[^)]+\)')
+_RE_FOR_LOOP = re.compile(rb'for\s*\([^;]+;\s*(\w+)\s*<\s*([^;]+);')
+_RE_NLMS = re.compile(rb'void\s+NLMS_Update.*?\n(.*?)(?=void|\Z)', re.DOTALL)
+_RE_ISR = re.compile(
+    rb'void\s+\w+_IRQHandler'
+    rb'|__attribute__\s*\(\s*\(interrupt\)\s*\)'
+    rb'|ISR\s*\('
+)
+_RE_VOLATILE = re.compile(rb'volatile\s+\w+')
+_RE_SHIFT = re.compile(rb'>>|<<')
+_RE_WHILE = re.compile(rb'while\s*\([^)]+\)')
+
+# Literal substrings the checks test for. The zero-width lookahead reports
+# a match at every position, so overlapping keywords (e.g. "sprintf(" and
+# "printf", "__SSAT" and "SAT") are all found in a single pass.
+_KEYWORDS = (
+    "strcpy(", "sprintf(", "gets(", "malloc", "free", "printf", "scanf",
+    "float", "double", "int32_t", "int16_t", "SAT", "CLAMP", "__SSAT",
+    "rand()", "random()", "__disable_irq()", "ENTER_CRITICAL()", "NLMS_Update",
+)
+_RE_KEYWORDS = re.compile(
+    b'(?=(' + b'|'.join(re.escape(kw.encode()) for kw in sorted(_KEYWORDS, key=len, reverse=True)) + b'))'
+)
+
+
+def _text(span: bytes) -> str:
+    """Decode a matched span of firmware source for reporting."""
+    return span.decode('utf-8', 'replace')
+
+
+@contextmanager
+def _mapped(path: Path):
+    """Map a file read-only so the scan can run over its bytes without decoding."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+@dataclass(frozen=True)
+class FirmwareScan:
+    """Everything the analyzers read from a firmware source, gathered once."""
+    keywords: FrozenSet[str]
+    malloc_calls: Tuple[str, ...]
+    buffer_decls: Tuple[Tuple[str, str, str], ...]
+    array_accesses: Tuple[Tuple[str, str], ...]
+    bounds_checks: int
+    for_loops: int
+    nlms_window: str
+    nlms_body: Optional[str]
+    isrs: int
+    volatile_vars: int
+    shift_ops: int
+    while_loops: Tuple[str, ...]
+
+
+def _scan(content) -> FirmwareScan:
+    """
+    Scan a firmware source (bytes, mmap or str) once.
+
+    Matched spans are decoded as they are collected, so the returned scan
+    stays valid after the underlying mapping is closed.
+    """
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+
+    keywords = frozenset(_text(kw) for kw in _RE_KEYWORDS.findall(content))
+
+    # Locate NLMS_Update once: the bounds check reads a fixed window from its
+    # first mention, the cycle estimate reads the function body
+    nlms_window, nlms_match = "", None
+    if "NLMS_Update" in keywords:
+        nlms_start = content.find(b"NLMS_Update")
+        nlms_window = _text(content[nlms_start:nlms_start + 2000])
+        nlms_match = _RE_NLMS.search(content)
+
+    return FirmwareScan(
+        keywords=keywords,
+        malloc_calls=tuple(_text(m) for m in _RE_MALLOC.findall(content)),
+        buffer_decls=tuple(
+            tuple(_text(part) for part in decl) for decl in _RE_BUFFER_DECL.findall(content)
+        ),
+        array_accesses=tuple(
+            (_text(arr), _text(idx)) for arr, idx in _RE_ARRAY_ACCESS.findall(content)
+        ),
+        bounds_checks=len(_RE_BOUNDS_CHECK.findall(content)),
+        for_loops=len(_RE_FOR_LOOP.findall(content)),
+        nlms_window=nlms_window,
+        nlms_body=_text(nlms_match.group(1)) if nlms_match else None,
+        isrs=len(_RE_ISR.findall(content)),
+        volatile_vars=len(_RE_VOLATILE.findall(content)),
+        shift_ops=len(_RE_SHIFT.findall(content)),
+        while_loops=tuple(_text(loop) for loop in _RE_WHILE.findall(content)),
+    )
+
 
 class FirmwareSafetyAnalyzer:
     """Analyzes firmware C code for safety and real-time compliance."""
@@ -23,58 +133,61 @@ class FirmwareSafetyAnalyzer:
         self.critical_issues = []
         self.warnings = []
         self.recommendations = []
+        self._last_scan = None
+
+    def _scan(self, content) -> FirmwareScan:
+        """Scan content, reusing the previous result for the same source object."""
+        if self._last_scan is None or self._last_scan[0] is not content:
+            self._last_scan = (content, _scan(content))
+        return self._last_scan[1]
 
     def analyze_all(self):
         """Run all firmware analysis checks."""
-        print("\n" + "="*80)
-        print("FIRMWARE SAFETY & REAL-TIME ANALYSIS")
-        print("="*80)
+        print("\n" + "="*80 + "\nFIRMWARE SAFETY & REAL-TIME ANALYSIS\n" + "="*80)
 
         firmware_file = Path("firmware/anc_firmware.c")
         if not firmware_file.exists():
             print("\n❌ Firmware file not found: firmware/anc_firmware.c")
             return False
 
-        content = firmware_file.read_text()
-
-        # Run analysis checks
-        self.analyze_memory_safety(content)
-        self.analyze_array_bounds(content)
-        self.analyze_real_time_guarantees(content)
-        self.analyze_interrupt_safety(content)
-        self.analyze_fixed_point_arithmetic(content)
-        self.analyze_determinism(content)
+        with _mapped(firmware_file) as content:
+            # Run analysis checks
+            self.analyze_memory_safety(content)
+            self.analyze_array_bounds(content)
+            self.analyze_real_time_guarantees(content)
+            self.analyze_interrupt_safety(content)
+            self.analyze_fixed_point_arithmetic(content)
+            self.analyze_determinism(content)
+        self._last_scan = None
 
         # Print summary
         return self.print_summary()
 
-    def analyze_memory_safety(self, content: str):
+    def analyze_memory_safety(self, content):
         """Check for memory safety issues."""
-        print("\n" + "-"*80)
-        print("1. MEMORY SAFETY ANALYSIS")
-        print("-"*80)
+        print("\n" + "-"*80 + "\n1. MEMORY SAFETY ANALYSIS\n" + "-"*80)
 
         issues = []
+        scan = self._scan(content)
 
         # Check for unsafe string operations
-        if "strcpy(" in content:
+        if "strcpy(" in scan.keywords:
             issues.append("Uses strcpy() - unbounded (use strncpy)")
 
-        if "sprintf(" in content:
+        if "sprintf(" in scan.keywords:
             issues.append("Uses sprintf() - unbounded (use snprintf)")
 
-        if "gets(" in content:
+        if "gets(" in scan.keywords:
             issues.append("Uses gets() - CRITICAL VULNERABILITY (use fgets)")
 
         # Check for malloc/free without bounds
-        malloc_calls = re.findall(r'malloc\s*\([^)]+\)', content)
-        for malloc in malloc_calls:
+        for malloc in scan.malloc_calls:
             print(f"    Found dynamic allocation: {malloc}")
-            if "malloc" in content and "free" not in content:
+            if "malloc" in scan.keywords and "free" not in scan.keywords:
                 issues.append("malloc() without corresponding free() - memory leak")
 
         # Check for buffer declarations
-        buffer_decls = re.findall(r'(float|int|uint32_t)\s+(\w+)\s*\[(\d+)\]', content)
+        buffer_decls = scan.buffer_decls
         for dtype, name, size in buffer_decls:
             if int(size) > 4096:
                 self.warnings.append(f"Large stack buffer: {name}[{size}] ({int(size)*4} bytes)")
@@ -88,27 +201,22 @@ class FirmwareSafetyAnalyzer:
 
         print(f"    Found {len(buffer_decls)} buffer declarations")
 
-    def analyze_array_bounds(self, content: str):
+    def analyze_array_bounds(self, content):
         """Check for array bounds checking."""
-        print("\n" + "-"*80)
-        print("2. ARRAY BOUNDS CHECKING")
-        print("-"*80)
+        print("\n" + "-"*80 + "\n2. ARRAY BOUNDS CHECKING\n" + "-"*80)
 
         issues = []
-
-        # Find array access patterns
-        array_accesses = re.findall(r'(\w+)\s*\[([^\]]+)\]', content)
+        scan = self._scan(content)
 
         # Check for modulo operations (common in circular buffers)
-        modulo_access = [(arr, idx) for arr, idx in array_accesses if '%' in idx]
+        modulo_access = [(arr, idx) for arr, idx in scan.array_accesses if '%' in idx]
         print(f"    Found {len(modulo_access)} modulo-based array accesses")
 
         # Look for bounds checks before array access
-        bounds_checks = re.findall(r'if\s*\([^<]+<[^)]+\)', content)
-        print(f"    Found {len(bounds_checks)} potential bounds checks")
+        print(f"    Found {scan.bounds_checks} potential bounds checks")
 
         # Critical: Check specific NLMS buffer access (lines 391-398, 429)
-        nlms_code = content[content.find("NLMS_Update"):content.find("NLMS_Update") + 2000] if "NLMS_Update" in content else ""
+        nlms_code = scan.nlms_window
 
         if nlms_code:
             # Check if buffer access uses modulo
@@ -122,8 +230,7 @@ class FirmwareSafetyAnalyzer:
                 print(f"    ✅ Found conditional bounds checks in NLMS")
 
         # Look for potential buffer overflows in loops
-        for_loops = re.findall(r'for\s*\([^;]+;\s*(\w+)\s*<\s*([^;]+);', content)
-        print(f"    Analyzed {len(for_loops)} for-loops for bounds safety")
+        print(f"    Analyzed {scan.for_loops} for-loops for bounds safety")
 
         if issues:
             for issue in issues:
@@ -132,13 +239,12 @@ class FirmwareSafetyAnalyzer:
         else:
             print(f"    ✅ Array bounds appear safe (modulo + bounds checks)")
 
-    def analyze_real_time_guarantees(self, content: str):
+    def analyze_real_time_guarantees(self, content):
         """Analyze real-time performance guarantees."""
-        print("\n" + "-"*80)
-        print("3. REAL-TIME GUARANTEES (<1ms @ 48kHz)")
-        print("-"*80)
+        print("\n" + "-"*80 + "\n3. REAL-TIME GUARANTEES (<1ms @ 48kHz)\n" + "-"*80)
 
         issues = []
+        scan = self._scan(content)
 
         # Calculate theoretical CPU cycles needed
         # Assumption: ARM Cortex-M7 @ 216MHz
@@ -156,14 +262,13 @@ class FirmwareSafetyAnalyzer:
         print(f"    Cycles available: {cycles_available:,}")
 
         # Find NLMS algorithm
-        nlms_match = re.search(r'void\s+NLMS_Update.*?\n(.*?)(?=void|\Z)', content, re.DOTALL)
-        if nlms_match:
-            nlms_code = nlms_match.group(1)
+        if scan.nlms_body is not None:
+            nlms_code = scan.nlms_body
 
             # Count operations in NLMS
-            mult_ops = len(re.findall(r'\*', nlms_code))
-            add_ops = len(re.findall(r'\+', nlms_code))
-            div_ops = len(re.findall(r'\/', nlms_code))
+            mult_ops = nlms_code.count('*')
+            add_ops = nlms_code.count('+')
+            div_ops = nlms_code.count('/')
 
             # Estimate cycles (very rough)
             # Multiply: ~1 cycle (with hardware FPU)
@@ -189,14 +294,14 @@ class FirmwareSafetyAnalyzer:
                 print(f"    ✅ Within budget ({utilization:.1f}% utilization)")
 
         # Check for non-deterministic operations
-        if "malloc" in content or "free" in content:
+        if scan.keywords & {"malloc", "free"}:
             issues.append("Dynamic memory allocation (non-deterministic)")
 
-        if "printf" in content or "scanf" in content:
+        if scan.keywords & {"printf", "scanf"}:
             issues.append("I/O operations in real-time code (slow)")
 
         # Check for floating point vs fixed point
-        if "float" in content or "double" in content:
+        if scan.keywords & {"float", "double"}:
             self.warnings.append("Uses floating-point (consider fixed-point for determinism)")
             print(f"    ⚠️  Uses floating-point (hardware FPU mitigates)")
 
@@ -205,35 +310,22 @@ class FirmwareSafetyAnalyzer:
                 print(f"    ❌ {issue}")
                 self.critical_issues.append(f"Real-time: {issue}")
 
-    def analyze_interrupt_safety(self, content: str):
+    def analyze_interrupt_safety(self, content):
         """Check for interrupt safety."""
-        print("\n" + "-"*80)
-        print("4. INTERRUPT SAFETY")
-        print("-"*80)
+        print("\n" + "-"*80 + "\n4. INTERRUPT SAFETY\n" + "-"*80)
 
         issues = []
+        scan = self._scan(content)
 
         # Look for interrupt handlers
-        isr_patterns = [
-            r'void\s+\w+_IRQHandler',
-            r'__attribute__\s*\(\s*\(interrupt\)\s*\)',
-            r'ISR\s*\(',
-        ]
-
-        isrs = []
-        for pattern in isr_patterns:
-            found = re.findall(pattern, content)
-            isrs.extend(found)
-
-        if isrs:
-            print(f"    Found {len(isrs)} interrupt handlers")
+        if scan.isrs:
+            print(f"    Found {scan.isrs} interrupt handlers")
 
             # Check for volatile variables
-            volatile_vars = re.findall(r'volatile\s+\w+', content)
-            print(f"    Found {len(volatile_vars)} volatile variables")
+            print(f"    Found {scan.volatile_vars} volatile variables")
 
             # Check for critical sections
-            if "__disable_irq()" in content or "ENTER_CRITICAL()" in content:
+            if scan.keywords & {"__disable_irq()", "ENTER_CRITICAL()"}:
                 print(f"    ✅ Uses critical sections for shared data")
             else:
                 issues.append("No critical sections found (race condition risk)")
@@ -246,22 +338,21 @@ class FirmwareSafetyAnalyzer:
                 print(f"    ⚠️  {issue}")
                 self.warnings.append(f"Interrupt Safety: {issue}")
 
-    def analyze_fixed_point_arithmetic(self, content: str):
+    def analyze_fixed_point_arithmetic(self, content):
         """Check fixed-point arithmetic correctness."""
-        print("\n" + "-"*80)
-        print("5. FIXED-POINT ARITHMETIC")
-        print("-"*80)
+        print("\n" + "-"*80 + "\n5. FIXED-POINT ARITHMETIC\n" + "-"*80)
+
+        scan = self._scan(content)
 
         # Check for fixed-point usage
-        if "int32_t" in content or "int16_t" in content:
+        if scan.keywords & {"int32_t", "int16_t"}:
             print(f"    Found fixed-point integer types")
 
             # Look for scaling/shifting operations
-            shift_ops = len(re.findall(r'>>', content)) + len(re.findall(r'<<', content))
-            print(f"    Found {shift_ops} bit-shift operations")
+            print(f"    Found {scan.shift_ops} bit-shift operations")
 
             # Check for overflow protection
-            if "SAT" in content or "CLAMP" in content or "__SSAT" in content:
+            if scan.keywords & {"SAT", "CLAMP", "__SSAT"}:
                 print(f"    ✅ Uses saturation arithmetic (overflow protection)")
             else:
                 self.warnings.append("No saturation arithmetic detected (overflow risk)")
@@ -269,31 +360,22 @@ class FirmwareSafetyAnalyzer:
         else:
             print(f"    Uses floating-point (float/double)")
 
-    def analyze_determinism(self, content: str):
+    def analyze_determinism(self, content):
         """Check for deterministic execution."""
-        print("\n" + "-"*80)
-        print("6. DETERMINISM ANALYSIS")
-        print("-"*80)
+        print("\n" + "-"*80 + "\n6. DETERMINISM ANALYSIS\n" + "-"*80)
 
         issues = []
+        scan = self._scan(content)
 
         # Check for non-deterministic operations
-        if "rand()" in content or "random()" in content:
+        if scan.keywords & {"rand()", "random()"}:
             issues.append("Uses rand() - non-deterministic")
 
         # Check for unbounded loops
-        while_loops = re.findall(r'while\s*\([^)]+\)', content)
-        for loop in while_loops:
+        for loop in scan.while_loops:
             if "true" in loop.lower() or "1" in loop:
                 issues.append(f"Potentially infinite while loop: {loop}")
 
-        # Check for recursion (bad for real-time)
-        functions = re.findall(r'void\s+(\w+)\s*\(', content)
-        for func in functions:
-            if content.count(func) > 1:  # Function calls itself
-                # More sophisticated check needed
-                pass
-
         if issues:
             for issue in issues:
                 print(f"    ⚠️  {issue}")
@@ -303,32 +385,35 @@ class FirmwareSafetyAnalyzer:
 
     def print_summary(self):
         """Print analysis summary."""
-        print("\n" + "="*80)
-        print("FIRMWARE ANALYSIS SUMMARY")
-        print("="*80)
+        buf = io.StringIO()
+
+        print("\n" + "="*80 + "\nFIRMWARE ANALYSIS SUMMARY\n" + "="*80, file=buf)
 
-        print(f"\n❌ CRITICAL ISSUES: {len(self.critical_issues)}")
+        print(f"\n❌ CRITICAL ISSUES: {len(self.critical_issues)}", file=buf)
         for issue in self.critical_issues:
-            print(f"  - {issue}")
+            print(f"  - {issue}", file=buf)
 
-        print(f"\n⚠️  WARNINGS: {len(self.warnings)}")
+        print(f"\n⚠️  WARNINGS: {len(self.warnings)}", file=buf)
         for warning in self.warnings:
-            print(f"  - {warning}")
+            print(f"  - {warning}", file=buf)
 
         if self.recommendations:
-            print(f"\n💡 RECOMMENDATIONS: {len(self.recommendations)}")
+            print(f"\n💡 RECOMMENDATIONS: {len(self.recommendations)}", file=buf)
             for rec in self.recommendations:
-                print(f"  - {rec}")
+                print(f"  - {rec}", file=buf)
 
-        print("\n" + "="*80)
+        print("\n" + "="*80, file=buf)
 
-        if len(self.critical_issues) == 0:
-            print("✅ NO CRITICAL FIRMWARE ISSUES FOUND")
-            print("Firmware appears safe for production deployment")
-            return True
+        ok = len(self.critical_issues) == 0
+        if ok:
+            print("✅ NO CRITICAL FIRMWARE ISSUES FOUND", file=buf)
+            print("Firmware appears safe for production deployment", file=buf)
         else:
-            print(f"❌ {len(self.critical_issues)} CRITICAL ISSUES REQUIRE FIXES")
-            return False
+            print(f"❌ {len(self.critical_issues)} CRITICAL ISSUES REQUIRE FIXES", file=buf)
+
+        # One write for the whole summary instead of a syscall per line
+        sys.stdout.write(buf.getvalue())
+        return ok
 
 
 def main():
@@ -11,9 +11,58 @@ Validates Terraform configuration for:
 5. Security configurations
 """
 
+import io
+import os
 import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Set
+from typing import Iterator, List, Dict, Set, Tuple
+
+# Block headers such as `variable "name" {`, one pattern per block keyword
+_RE_HCL_BLOCK = {
+    keyword: re.compile(rf'{keyword}\s+"([^"]+)"\s*\{{')
+    for keyword in ("variable", "module")
+}
+# Braces plus quoted strings, so braces inside "${...}" strings are skipped
+_RE_HCL_TOKEN = re.compile(r'"(?:[^"\\\n]|\\.)*"|[{}]')
+
+
+@lru_cache(maxsize=128)
+def _cached_read(path: str) -> str:
+    """Read a Terraform file once per run; later checks reuse the text."""
+    return Path(path).read_text()
+
+
+def _iter_hcl_blocks(content: str, keyword: str) -> Iterator[Tuple[str, int, int]]:
+    """
+    Yield (name, body_start, body_end) for each top-level `keyword "name" { ... }`.
+
+    Matching braces are found by tracking nesting depth over the brace and
+    string tokens after each header, so the whole file is walked once with
+    no regex backtracking and nested blocks are kept in the body.
+    """
+    header = _RE_HCL_BLOCK[keyword]
+    pos = 0
+    while True:
+        match = header.search(content, pos)
+        if match is None:
+            return
+        depth = 1
+        for token in _RE_HCL_TOKEN.finditer(content, match.end()):
+            if token.group() == '{':
+                depth += 1
+            elif token.group() == '}':
+                depth -= 1
+                if depth == 0:
+                    yield match.group(1), match.end(), token.start()
+                    pos = token.end()
+                    break
+        else:
+            # Unterminated block: nothing after it can be matched either
+            return
+
 
 class TerraformValidator:
     """Validates Terraform configuration files."""
@@ -26,9 +75,7 @@ class TerraformValidator:
 
     def validate_all(self):
         """Run all Terraform validation checks."""
-        print("\n" + "="*80)
-        print("TERRAFORM CONFIGURATION VALIDATION")
-        print("="*80)
+        print("\n" + "="*80 + "\nTERRAFORM CONFIGURATION VALIDATION\n" + "="*80)
 
         # Find all Terraform files
         tf_dir = Path("cloud/terraform")
@@ -53,9 +100,7 @@ class TerraformValidator:
 
     def validate_main_config(self):
         """Validate main Terraform configuration."""
-        print("\n" + "-"*80)
-        print("1. MAIN CONFIGURATION ANALYSIS")
-        print("-"*80)
+        print("\n" + "-"*80 + "\n1. MAIN CONFIGURATION ANALYSIS\n" + "-"*80)
 
         main_files = ["cloud/terraform/main.tf", "cloud/terraform/main_working.tf"]
 
@@ -64,75 +109,90 @@ class TerraformValidator:
                 continue
 
             print(f"\n  Analyzing: {main_file}")
-            content = Path(main_file).read_text()
+            content = _cached_read(main_file)
 
-            # Find module declarations
-            modules = re.findall(r'module\s+"([^"]+)"\s*\{', content)
+            # Find module declarations with their body spans in one pass
+            modules = list(_iter_hcl_blocks(content, "module"))
             print(f"    Found {len(modules)} module declarations:")
 
-            for module in modules:
+            for module, body_start, body_end in modules:
                 print(f"      - {module}")
                 self.modules_used.add(module)
 
                 # Check if module has source
-                module_block = re.search(
-                    rf'module\s+"{module}"\s*\{{([^}}]+)\}}',
-                    content,
-                    re.DOTALL
-                )
-                if module_block:
-                    if 'source' not in module_block.group(1):
-                        self.errors.append(f"{main_file}: Module '{module}' missing source")
+                if 'source' not in content[body_start:body_end]:
+                    self.errors.append(f"{main_file}: Module '{module}' missing source")
 
     def validate_modules(self):
         """Validate module implementations."""
-        print("\n" + "-"*80)
-        print("2. MODULE IMPLEMENTATION ANALYSIS")
-        print("-"*80)
+        print("\n" + "-"*80 + "\n2. MODULE IMPLEMENTATION ANALYSIS\n" + "-"*80)
 
         modules_dir = Path("cloud/terraform/modules")
         if not modules_dir.exists():
             self.errors.append("Modules directory does not exist")
             return
 
-        for module_dir in modules_dir.iterdir():
-            if module_dir.is_dir():
-                module_name = module_dir.name
-                self.modules_exist.add(module_name)
-
-                print(f"\n  Module: {module_name}")
-
-                # Check for required files
-                main_tf = module_dir / "main.tf"
-                variables_tf = module_dir / "variables.tf"
-                outputs_tf = module_dir / "outputs.tf"
+        # DirEntry.is_dir() uses the type from the directory listing, so this
+        # avoids a stat per entry; symlinks are still followed (one stat each)
+        # so linked modules are validated as before
+        with os.scandir(modules_dir) as entries:
+            module_dirs = [Path(entry.path) for entry in entries if entry.is_dir()]
+
+        # Modules are independent and I/O-bound; validate them concurrently and
+        # merge reports, errors and warnings back in directory order
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(self._validate_one_module, module_dirs))
+
+        for module_dir, (lines, errors, warnings) in zip(module_dirs, results):
+            self.modules_exist.add(module_dir.name)
+            for line in lines:
+                print(line)
+            self.errors.extend(errors)
+            self.warnings.extend(warnings)
+
+    def _validate_one_module(self, module_dir: Path) -> Tuple[List[str], List[str], List[str]]:
+        """Validate one module directory, returning (report lines, errors, warnings)."""
+        module_name = module_dir.name
+        lines = [f"\n  Module: {module_name}"]
+        errors = []
+        warnings = []
+
+        # Check for required files against one listing of the module directory
+        with os.scandir(module_dir) as entries:
+            files = {entry.name for entry in entries if entry.is_file()}
+
+        if "main.tf" in files:
+            lines.append(f"    ✅ main.tf found")
+            file_lines, file_errors = self.validate_module_file(module_dir / "main.tf", module_name)
+            lines.extend(file_lines)
+            errors.extend(file_errors)
+        else:
+            errors.append(f"Module '{module_name}' missing main.tf")
 
-                if main_tf.exists():
-                    print(f"    ✅ main.tf found")
-                    self.validate_module_file(main_tf, module_name)
-                else:
-                    self.errors.append(f"Module '{module_name}' missing main.tf")
+        if "variables.tf" in files:
+            lines.append(f"    ✅ variables.tf found")
+        else:
+            warnings.append(f"Module '{module_name}' missing variables.tf")
 
-                if variables_tf.exists():
-                    print(f"    ✅ variables.tf found")
-                else:
-                    self.warnings.append(f"Module '{module_name}' missing variables.tf")
+        if "outputs.tf" in files:
+            lines.append(f"    ✅ outputs.tf found")
 
-                if outputs_tf.exists():
-                    print(f"    ✅ outputs.tf found")
+        return lines, errors, warnings
 
-    def validate_module_file(self, file_path: Path, module_name: str):
-        """Validate individual module file."""
-        content = file_path.read_text()
+    def validate_module_file(self, file_path: Path, module_name: str) -> Tuple[List[str], List[str]]:
+        """Validate individual module file, returning (report lines, errors)."""
+        lines = []
+        errors = []
+        content = _cached_read(str(file_path))
 
         # Check for resources
         resources = re.findall(r'resource\s+"([^"]+)"\s+"([^"]+)"', content)
-        print(f"    Found {len(resources)} resources")
+        lines.append(f"    Found {len(resources)} resources")
 
         # Check for data sources
         data_sources = re.findall(r'data\s+"([^"]+)"\s+"([^"]+)"', content)
         if data_sources:
-            print(f"    Found {len(data_sources)} data sources")
+            lines.append(f"    Found {len(data_sources)} data sources")
 
         # Check for variable usage without declaration
         var_usage = set(re.findall(r'var\.(\w+)', content))
@@ -140,21 +200,21 @@ class TerraformValidator:
             # Check if variables.tf exists and declares these
             variables_file = file_path.parent / "variables.tf"
             if variables_file.exists():
-                var_content = variables_file.read_text()
+                var_content = _cached_read(str(variables_file))
                 var_declarations = set(re.findall(r'variable\s+"(\w+)"', var_content))
 
                 undefined_vars = var_usage - var_declarations
                 if undefined_vars:
                     for var in undefined_vars:
-                        self.errors.append(
+                        errors.append(
                             f"Module '{module_name}': Variable '{var}' used but not declared"
                         )
 
+        return lines, errors
+
     def check_module_existence(self):
         """Check if used modules actually exist."""
-        print("\n" + "-"*80)
-        print("3. MODULE EXISTENCE CHECK")
-        print("-"*80)
+        print("\n" + "-"*80 + "\n3. MODULE EXISTENCE CHECK\n" + "-"*80)
 
         print(f"\n  Modules used in main config: {len(self.modules_used)}")
         for module in sorted(self.modules_used):
@@ -173,19 +233,20 @@ class TerraformValidator:
 
     def validate_variables(self):
         """Validate variable definitions."""
-        print("\n" + "-"*80)
-        print("4. VARIABLES VALIDATION")
-        print("-"*80)
+        print("\n" + "-"*80 + "\n4. VARIABLES VALIDATION\n" + "-"*80)
 
         variables_file = Path("cloud/terraform/variables.tf")
         if not variables_file.exists():
             self.errors.append("Root variables.tf not found")
             return
 
-        content = variables_file.read_text()
+        content = _cached_read(str(variables_file))
 
         # Find all variable declarations
-        variables = re.findall(r'variable\s+"([^"]+)"\s*\{([^}]+)\}', content, re.DOTALL)
+        variables = [
+            (name, content[start:end])
+            for name, start, end in _iter_hcl_blocks(content, "variable")
+        ]
         print(f"\n  Found {len(variables)} variable declarations")
 
         for var_name, var_block in variables:
@@ -206,32 +267,34 @@ class TerraformValidator:
 
     def print_summary(self):
         """Print validation summary."""
-        print("\n" + "="*80)
-        print("TERRAFORM VALIDATION SUMMARY")
-        print("="*80)
+        buf = io.StringIO()
 
-        print(f"\n❌ ERRORS: {len(self.errors)}")
+        print("\n" + "="*80 + "\nTERRAFORM VALIDATION SUMMARY\n" + "="*80, file=buf)
+
+        print(f"\n❌ ERRORS: {len(self.errors)}", file=buf)
         for error in self.errors:
-            print(f"  - {error}")
+            print(f"  - {error}", file=buf)
 
-        print(f"\n⚠️  WARNINGS: {len(self.warnings)}")
+        print(f"\n⚠️  WARNINGS: {len(self.warnings)}", file=buf)
         for warning in self.warnings:
-            print(f"  - {warning}")
+            print(f"  - {warning}", file=buf)
 
-        print("\n" + "="*80)
+        print("\n" + "="*80, file=buf)
 
-        if len(self.errors) == 0:
-            print("✅ TERRAFORM CONFIGURATION VALID")
-            print("Ready for deployment with terraform init/plan/apply")
-            return True
+        ok = len(self.errors) == 0
+        if ok:
+            print("✅ TERRAFORM CONFIGURATION VALID", file=buf)
+            print("Ready for deployment with terraform init/plan/apply", file=buf)
         else:
-            print(f"❌ {len(self.errors)} ERRORS MUST BE FIXED")
-            return False
+            print(f"❌ {len(self.errors)} ERRORS MUST BE FIXED", file=buf)
+
+        # One write for the whole summary instead of a syscall per line
+        sys.stdout.write(buf.getvalue())
+        return ok
 
 
 def main():
     """Main entry point."""
-    import os
     os.chdir(Path(__file__).parent.parent.parent)
 
     validator = TerraformValidator()
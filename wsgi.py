@@ -7,9 +7,11 @@ import os
 import sys
 from pathlib import Path
 
-# Add project directories to Python path
-project_root = Path(__file__).parent
-sys.path.insert(0, str(project_root))
+# Add the project root to the Python path unless it is already there
+# (gunicorn puts its working directory on sys.path before loading us)
+project_root = str(Path(__file__).resolve().parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 # Set production environment
 os.environ.setdefault('FLASK_ENV', 'production')